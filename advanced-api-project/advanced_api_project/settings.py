@@ -83,6 +83,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The books response cache keeps its catalog version here (api/caching.py),
+# so every worker process must see the same cache: a per-process LocMemCache
+# would let a worker keep serving pages another worker's write invalidated.
+# The file cache is shared by the workers of one host; use Redis or
+# Memcached when running on several.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -123,3 +139,6 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Reports suite wall time; see api/testing.py for the shared test fixtures.
+TEST_RUNNER = 'api.test_runner.TimedTestRunner'
@@ -0,0 +1,122 @@
+"""
+Versioned response cache and conditional GET for the books read API.
+
+Every write to a Book or Author bumps one catalog version (see
+``api.signals`` and ``BookBulkSerializer``). Cached responses are keyed on
+that version, the path, the normalized query parameters and the negotiated
+format, so a bump invalidates every cached page at once without deleting
+anything. The same key is sent as the ``ETag``: a matching
+``If-None-Match`` gets a 304 before the database or serializer is touched.
+
+The version is the time of the last catalog write in nanoseconds, so it
+also gives ``Last-Modified``: any write, including a delete or an author
+rename that no row timestamp records, moves it forward. It is only sent
+once the second of that write is over, since a later write in the same
+second would share the value. ``If-Modified-Since`` is checked against it,
+again without reading the database, and ignored when ``If-None-Match`` is
+present (RFC 7232 §3.3).
+
+The version lives in ``CACHES['default']`` with no timeout, so that cache
+must be shared by every worker process; the ``api.W001`` system check warns
+when it is process-local.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:books:version'
+
+
+def get_timeout():
+    return getattr(settings, 'BOOK_CACHE_TIMEOUT', 300)
+
+
+def cache_is_shared():
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump():
+    cache.set(VERSION_KEY, max(time.time_ns(), (cache.get(VERSION_KEY) or 0) + 1), None)
+
+
+def bump_version():
+    """
+    Invalidate every cached books response. Bumps now, so this process never
+    serves stale pages, and again on commit, so pages cached by concurrent
+    readers between the write and the commit are dropped as well.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def response_key(request, version, kwargs):
+    params = sorted((name, value) for name in request.query_params for value in request.query_params.getlist(name))
+    raw = '|'.join([
+        str(version), request.path, urlencode(params), request.accepted_renderer.format,
+        urlencode(sorted(kwargs.items())),
+    ])
+    return 'api:books:response:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def last_modified(version):
+    """The second of the write that set ``version``, or None while that second lasts."""
+    modified = version // 10**9
+    return modified if modified < int(time.time()) else None
+
+
+class CachedResponseMixin:
+    """Serve GETs from the versioned cache, honoring If-None-Match / If-Modified-Since."""
+    cache_responses = True
+
+    def get(self, request, *args, **kwargs):
+        if not self.cache_responses:
+            return super().get(request, *args, **kwargs)
+
+        version = get_version()
+        key = response_key(request, version, kwargs)
+        etag = '"%s"' % key.rsplit(':', 1)[-1]
+        modified = last_modified(version)
+        if 'If-None-Match' in request.headers:
+            if etag in request.headers['If-None-Match']:
+                return self.not_modified(etag)
+        else:
+            since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            if since is not None and modified is not None and modified <= since:
+                return self.not_modified(etag)
+
+        data = cache.get(key)
+        if data is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, get_timeout())
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+    @staticmethod
+    def not_modified(etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,15 @@
+from django.core import checks
+
+from .caching import cache_is_shared
+
+
+@checks.register(checks.Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [checks.Warning(
+        "The books response cache is per-process: CACHES['default'] is process-local.",
+        hint="Configure a cache shared by all workers (e.g. file-based, Redis or Memcached) "
+             "so catalog writes invalidate cached pages everywhere.",
+        id='api.W001',
+    )]
@@ -0,0 +1,67 @@
+"""
+Streaming export of the book catalog.
+
+Rows are read with ``values_list().iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL, ``fetchmany`` batches elsewhere) and written to a
+``StreamingHttpResponse`` one line at a time, so memory stays flat however
+many books match. The renderers exist for content negotiation only
+(``?format=csv`` or an ``Accept`` header); the view never renders a list.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+FIELDS = ['id', 'title', 'publication_year', 'author']
+CHUNK_SIZE = 2000
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ''.join(ndjson_lines(data or []))
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ''.join(csv_lines(data or []))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row))) + '\n'
+
+
+class _Line:
+    """File-like target that hands csv.writer's output straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+WRITERS = {'ndjson': ndjson_lines, 'csv': csv_lines}
+
+
+def stream_books(queryset, renderer, chunk_size=CHUNK_SIZE):
+    rows = queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size)
+    response = StreamingHttpResponse(
+        WRITERS[renderer.format](rows),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}',
+    )
+    response['Content-Disposition'] = f'attachment; filename="books.{renderer.format}"'
+    return response
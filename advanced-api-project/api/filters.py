@@ -0,0 +1,27 @@
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .search import get_backend
+
+
+class BookSearchFilter(filters.SearchFilter):
+    """
+    ?search= over book titles and author names through the configured
+    search backend (see api/search.py) instead of ``icontains`` lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return get_backend().search(queryset, query)
+
+
+class BookOrderingFilter(filters.OrderingFilter):
+    """Orders search results by relevance unless ?ordering= is given."""
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params and request.query_params.get(api_settings.SEARCH_PARAM, '').strip():
+            return ['-search_rank'] + list(self.get_default_ordering(view) or [])
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,113 @@
+import json
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+
+from api.models import Author
+from api.views import BookListView
+
+
+def sample_values():
+    """
+    Representative filter values; only the plan shape matters, but the
+    ``author`` filter only accepts an existing pk.
+    """
+    author = Author.objects.order_by("pk").first() or Author.objects.create(name="Sample")
+    return {"title": "Sample", "author": str(author.pk), "publication_year": "2000"}
+
+
+def query_combinations(view_class, max_filters, values):
+    """Yield the query-parameter dicts BookListView can be called with."""
+    orderings = [None]
+    for field in view_class.ordering_fields:
+        orderings += [field, "-" + field]
+
+    for size in range(max_filters + 1):
+        for filters in combinations(view_class.filterset_fields, size):
+            for ordering in orderings:
+                params = {name: values[name] for name in filters}
+                if ordering:
+                    params["ordering"] = ordering
+                yield params
+
+
+def build_queryset(view_class, params):
+    """Run the view's own filter backends, exactly as a request would."""
+    view = view_class()
+    view.setup(APIRequestFactory().get("/", params))
+    view.request = view.initialize_request(view.request)
+    view.format_kwarg = None
+    return view.filter_queryset(view.get_queryset())
+
+
+def explain(queryset):
+    """Return ``(plan_lines, issues)`` for the queryset's SQL."""
+    sql, params = queryset.query.sql_with_params()
+    table = queryset.model._meta.db_table
+    issues = []
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            lines = [row[-1] for row in cursor.fetchall()]
+            for line in lines:
+                if line == f"SCAN {table}":
+                    issues.append("full scan")
+                if "TEMP B-TREE" in line:
+                    issues.append("filesort")
+        elif connection.vendor == "postgresql":
+            # Ask whether an index *can* serve the query, even on tiny tables.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plans, lines = [cursor.fetchone()[0][0]["Plan"]], []
+            while plans:
+                plan = plans.pop()
+                lines.append(plan["Node Type"] + (" on " + plan["Relation Name"] if "Relation Name" in plan else ""))
+                if plan["Node Type"] == "Seq Scan" and plan.get("Relation Name") == table:
+                    issues.append("full scan")
+                if plan["Node Type"] in ("Sort", "Incremental Sort"):
+                    issues.append("filesort")
+                plans.extend(plan.get("Plans", []))
+        else:
+            cursor.execute("EXPLAIN " + sql, params)
+            lines = [" ".join(map(str, row)) for row in cursor.fetchall()]
+    return lines, issues
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every BookListView filter/ordering combination and report "
+        "the ones that fall back to a full table scan or a sort."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-filters", type=int, default=1,
+                            help="Largest number of filters combined in one query.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+        parser.add_argument("--fail-on-issues", action="store_true",
+                            help="Exit with an error if any combination needs a scan or sort.")
+
+    def handle(self, *args, max_filters, **options):
+        report = []
+        # Rolled back, so a sample author created for the plans never persists.
+        with transaction.atomic():
+            values = sample_values()
+            for params in query_combinations(BookListView, max_filters, values):
+                plan, issues = explain(build_queryset(BookListView, params))
+                report.append({"params": params, "issues": issues, "plan": plan})
+            transaction.set_rollback(True)
+
+        flagged = [entry for entry in report if entry["issues"]]
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for entry in report:
+                status = ", ".join(entry["issues"]) or "ok"
+                self.stdout.write(f"{status:<22} {entry['params']}")
+                for line in entry["plan"]:
+                    self.stdout.write(f"{'':<22}   {line}")
+            self.stdout.write(f"{len(report)} combination(s), {len(flagged)} flagged.")
+
+        if flagged and options["fail_on_issues"]:
+            raise CommandError(f"{len(flagged)} BookListView query combination(s) are not index-backed.")
@@ -0,0 +1,67 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import search
+from api.models import Author, Book
+from api.words import WORDS
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ?search= latency of the icontains filter and the indexed backend "
+        "on a synthetic catalog. Seeded rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000)
+        parser.add_argument('--authors', type=int, default=20000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, books, authors, queries, seed, **options):
+        rng = random.Random(seed)
+        try:
+            with transaction.atomic():
+                self.seed(rng, books, authors)
+                terms = [" ".join(rng.sample(WORDS, 2))[:-2] for _ in range(queries)]
+                for backend in (search.IcontainsBackend(), search.get_backend()):
+                    self.report(backend, terms)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rng, books, authors):
+        self.stderr.write(f"Seeding {books} books by {authors} authors...")
+        created = Author.objects.bulk_create(
+            [Author(name=f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {n}") for n in range(authors)],
+            batch_size=5000,
+        )
+        batch = []
+        for n in range(books):
+            title = " ".join(rng.choice(WORDS) for _ in range(3)).title()
+            batch.append(Book(title=title, publication_year=rng.randint(1900, 2024), author=rng.choice(created)))
+            if len(batch) == 5000 or n == books - 1:
+                # bulk_create skips the post_save signal, so index explicitly.
+                search.index_books(Book.objects.bulk_create(batch))
+                batch = []
+
+    def report(self, backend, terms):
+        timings = []
+        for term in terms:
+            start = time.perf_counter()
+            list(backend.search(Book.objects.all(), term).order_by('-search_rank', 'title')[:20])
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"{type(backend).__name__:<26} "
+            f"p50 {statistics.median(timings):9.2f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:9.2f} ms"
+        )
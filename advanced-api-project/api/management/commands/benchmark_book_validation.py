@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Author
+from api.serializers import BookBulkSerializer, BookSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class UncompiledBulkSerializer(BookBulkSerializer):
+    compiled_validation = False
+
+
+class UncompiledBookSerializer(BookSerializer):
+    class Meta(BookSerializer.Meta):
+        list_serializer_class = UncompiledBulkSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare items/sec of per-item BookSerializer validation, the bulk list "
+        "serializer with DRF field validation, and the compiled bulk path. "
+        "Seeded authors are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=500)
+        parser.add_argument('--invalid', type=float, default=0.02,
+                            help="Fraction of items with a bad year or author.")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, items, authors, invalid, repeat, seed, **options):
+        rng = random.Random(seed)
+        try:
+            with transaction.atomic():
+                ids = [author.pk for author in Author.objects.bulk_create(
+                    [Author(name=f"Author {n}") for n in range(authors)]
+                )]
+                payload = [self.item(rng, n, ids, invalid) for n in range(items)]
+                self.report("per-item BookSerializer", repeat, items, lambda: self.per_item(payload))
+                self.report("bulk, DRF fields", repeat, items, lambda: self.bulk(UncompiledBookSerializer, payload))
+                self.report("bulk, compiled", repeat, items, lambda: self.bulk(BookSerializer, payload))
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def item(rng, n, ids, invalid):
+        item = {"title": f"  Book {n}  ", "publication_year": rng.randint(1900, 2024), "author": rng.choice(ids)}
+        if rng.random() < invalid:
+            item[rng.choice(["publication_year", "author"])] = 999999
+        return item
+
+    @staticmethod
+    def per_item(payload):
+        return sum(BookSerializer(data=item).is_valid() for item in payload)
+
+    @staticmethod
+    def bulk(serializer_class, payload):
+        serializer = serializer_class(data=payload, many=True)
+        serializer.is_valid(raise_exception=True)
+        return len(serializer.validated_data)
+
+    def report(self, label, repeat, items, run):
+        best, valid = None, 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            valid = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(f"{label:<26} {items / best:>10.0f} items/s  ({valid} valid)")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api import stats
+from api.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the AuthorStats summary rows behind the author stats endpoints."
+
+    def handle(self, *args, **options):
+        stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {AuthorStats.objects.count()} author(s)."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api import search
+from api.models import BookDocument
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents behind the books ?search= filter."
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {BookDocument.objects.count()} book(s)."))
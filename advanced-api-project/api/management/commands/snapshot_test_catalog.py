@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.testing import SNAPSHOT, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Regenerate the seeded catalog snapshot loaded by CatalogTestCase."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=40)
+        parser.add_argument('--books', type=int, default=400)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, authors, books, seed, **options):
+        write_snapshot(authors=authors, books=books, seed=seed)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {books} book(s) by {authors} author(s) to {SNAPSHOT}."))
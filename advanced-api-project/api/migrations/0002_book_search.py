@@ -0,0 +1,101 @@
+# Generated by Django 4.2 on 2026-10-18 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_bookdocument_fts USING fts5(
+        title, author_name,
+        content='api_bookdocument', content_rowid='book_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_bookdocument_fts_insert AFTER INSERT ON api_bookdocument BEGIN
+        INSERT INTO api_bookdocument_fts(rowid, title, author_name)
+        VALUES (new.book_id, new.title, new.author_name);
+    END
+    """,
+    """
+    CREATE TRIGGER api_bookdocument_fts_delete AFTER DELETE ON api_bookdocument BEGIN
+        INSERT INTO api_bookdocument_fts(api_bookdocument_fts, rowid, title, author_name)
+        VALUES ('delete', old.book_id, old.title, old.author_name);
+    END
+    """,
+    """
+    CREATE TRIGGER api_bookdocument_fts_update AFTER UPDATE ON api_bookdocument BEGIN
+        INSERT INTO api_bookdocument_fts(api_bookdocument_fts, rowid, title, author_name)
+        VALUES ('delete', old.book_id, old.title, old.author_name);
+        INSERT INTO api_bookdocument_fts(rowid, title, author_name)
+        VALUES (new.book_id, new.title, new.author_name);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS api_bookdocument_fts_update",
+    "DROP TRIGGER IF EXISTS api_bookdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS api_bookdocument_fts_insert",
+    "DROP TABLE IF EXISTS api_bookdocument_fts",
+]
+
+# Must match PostgresFullTextBackend.vector in api/search.py.
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX api_bookdocument_search ON api_bookdocument USING GIN ((
+        setweight(to_tsvector('simple', title), 'A') ||
+        setweight(to_tsvector('simple', author_name), 'B')
+    ))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS api_bookdocument_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_FORWARD,
+        'postgresql': POSTGRES_FORWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+    Book = apps.get_model('api', 'Book')
+    BookDocument = apps.get_model('api', 'BookDocument')
+    BookDocument.objects.bulk_create(
+        [BookDocument(book=book, title=book.title, author_name=book.author.name)
+         for book in Book.objects.select_related('author').iterator()],
+        batch_size=2000,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_REVERSE,
+        'postgresql': POSTGRES_REVERSE,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookDocument',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='api.book')),
+                ('title', models.CharField(max_length=255)),
+                ('author_name', models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 18:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_author_stats(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+    AuthorStats = apps.get_model('api', 'AuthorStats')
+    Book = apps.get_model('api', 'Book')
+    stats = {pk: AuthorStats(author_id=pk, book_count=0, decades={})
+             for pk in Author.objects.values_list('pk', flat=True)}
+    for author_id, year in Book.objects.values_list('author_id', 'publication_year').iterator():
+        row = stats[author_id]
+        row.book_count += 1
+        decade = str(year // 10 * 10)
+        row.decades[decade] = row.decades.get(decade, 0) + 1
+        row.first_year = year if row.first_year is None else min(row.first_year, year)
+        row.last_year = year if row.last_year is None else max(row.last_year, year)
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.author')),
+                ('book_count', models.PositiveIntegerField(default=0)),
+                ('first_year', models.IntegerField(null=True)),
+                ('last_year', models.IntegerField(null=True)),
+                ('decades', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.RunPython(populate_author_stats, migrations.RunPython.noop),
+    ]
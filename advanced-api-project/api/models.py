@@ -14,14 +14,88 @@ class Author(models.Model):
 class Book(models.Model):
     title = models.CharField(max_length=255)
     publication_year = models.IntegerField()
+    # Drives Last-Modified on the read API (see api/caching.py).
+    updated_at = models.DateTimeField(auto_now=True)
 
     # One-to-many relationship:
     # One Author -> Many Books
+    # (no single-column index: the composite indexes below lead with author)
     author = models.ForeignKey(
         Author,
         related_name='books',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
 
+    # Indexes follow BookListView's access paths: each filterset field
+    # followed by each ordering field, so a filtered, ordered page is an
+    # index range scan without a sort. Check with `manage.py advise_book_indexes`.
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'publication_year'], name='book_title_year_idx'),
+            models.Index(fields=['author', 'title'], name='book_author_title_idx'),
+            models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+            models.Index(fields=['publication_year', 'title'], name='book_year_title_idx'),
+        ]
+
     def __str__(self):
         return self.title
+
+
+# BookDocument is the denormalized text the books search indexes (see
+# api/search.py). It is kept in sync by signals; the full-text index over it
+# is database specific and maintained by the database itself.
+class BookDocument(models.Model):
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        related_name='search_document',
+        on_delete=models.CASCADE
+    )
+    title = models.CharField(max_length=255)
+    author_name = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.title} / {self.author_name}"
+
+
+class BookSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table over BookDocument (created by migration 0002), so
+    a search can join it once and both MATCH and rank in that join. Not
+    present on other databases.
+    """
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index',
+        on_delete=models.DO_NOTHING,
+    )
+    # FTS5's hidden column named after the table: the left side of MATCH and
+    # the first argument of bm25().
+    document = models.TextField(db_column='api_bookdocument_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'api_bookdocument_fts'
+
+
+# AuthorStats is a per-author summary of their books, kept current by
+# signals (see api/stats.py) so the stats endpoints never GROUP BY books.
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        Author,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE
+    )
+    book_count = models.PositiveIntegerField(default=0)
+    first_year = models.IntegerField(null=True)
+    last_year = models.IntegerField(null=True)
+    # Books per decade, e.g. {"1990": 2, "2000": 5}.
+    decades = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.author_id}: {self.book_count} book(s)"
@@ -0,0 +1,129 @@
+"""
+Pluggable full-text search for the books API.
+
+Every Book has a BookDocument row (title + author name) kept current by
+``api.signals``. Backends only differ in how they query it:
+
+- ``SQLiteFTS5Backend``: an FTS5 external-content table over BookDocument,
+  synced by triggers (migration 0002), ranked with bm25.
+- ``PostgresFullTextBackend``: a GIN expression index on the weighted
+  tsvector of BookDocument, ranked with ts_rank.
+- ``IcontainsBackend``: unindexed ``icontains`` scan, the fallback for other
+  databases and the baseline for ``benchmark_book_search``.
+
+Terms are ANDed and each term matches as a prefix, so "tolk hob" finds
+"The Hobbit" by "J. R. R. Tolkien". Title matches rank above author matches.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Book, BookDocument, BookSearchIndex
+
+TERM = re.compile(r'\w+')
+
+
+def terms(query):
+    return TERM.findall(query.lower())
+
+
+class IcontainsBackend:
+    def search(self, queryset, query):
+        for term in terms(query):
+            queryset = queryset.filter(Q(title__icontains=term) | Q(author__name__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0))
+
+
+class Match(Lookup):
+    """``document__match=<query>``: an FTS5 MATCH against the table's hidden column."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+BookSearchIndex._meta.get_field('document').register_lookup(Match)
+
+
+class SQLiteFTS5Backend:
+    def search(self, queryset, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        match = ' '.join(f'"{word}"*' for word in words)
+        # One inner join to the FTS table: MATCH runs once per query and bm25
+        # is read from the same cursor. bm25 is lower-is-better; negate it so
+        # every backend sorts by -search_rank.
+        rank = Func(F('search_index__document'), Value(10.0), Value(1.0), function='bm25', output_field=FloatField())
+        return queryset.filter(search_index__document__match=match).annotate(search_rank=-rank)
+
+
+class PostgresFullTextBackend:
+    # Must match the expression of the api_bookdocument_search GIN index.
+    vector = (
+        "setweight(to_tsvector('simple', api_bookdocument.title), 'A') || "
+        "setweight(to_tsvector('simple', api_bookdocument.author_name), 'B')"
+    )
+
+    def search(self, queryset, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        # The pk__in subquery is answered from the GIN index; the rank is
+        # computed only for the matching documents.
+        matching = RawSQL(
+            f"SELECT book_id FROM api_bookdocument WHERE {self.vector} @@ to_tsquery('simple', %s)", [tsquery],
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank({self.vector}, to_tsquery('simple', %s)) FROM api_bookdocument "
+            "WHERE api_bookdocument.book_id = api_book.id",
+            [tsquery], output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matching).annotate(search_rank=rank)
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresFullTextBackend,
+}
+
+
+def get_backend():
+    path = getattr(settings, 'BOOK_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, IcontainsBackend)()
+
+
+def document_for(book):
+    return BookDocument(book=book, title=book.title, author_name=book.author.name)
+
+
+def index_books(books):
+    """Create or refresh the search documents of ``books`` in one statement."""
+    BookDocument.objects.bulk_create(
+        [document_for(book) for book in books],
+        update_conflicts=True,
+        unique_fields=['book'],
+        update_fields=['title', 'author_name'],
+    )
+
+
+def rebuild():
+    BookDocument.objects.all().delete()
+    books = Book.objects.select_related('author').order_by('pk')
+    batch = []
+    for book in books.iterator(chunk_size=2000):
+        batch.append(book)
+        if len(batch) == 2000:
+            index_books(batch)
+            batch = []
+    if batch:
+        index_books(batch)
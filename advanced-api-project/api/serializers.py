@@ -1,35 +1,353 @@
-from rest_framework import serializers
+import time
 from datetime import datetime
-from .models import Author, Book
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty, get_error_detail
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from . import search, stats
+from .caching import bump_version
+from .models import Author, AuthorStats, Book
+
+
+class QueryPlanningMixin:
+    """
+    Lets a ModelSerializer trim its fields per request and eager-load
+    exactly the relations its remaining fields will read.
+
+    Query parameters (read from the request in the serializer context):
+    - ``?fields=id,name`` keeps only the listed top-level fields.
+    - ``?expand=books`` keeps only the listed nested relations; ``?expand=``
+      with no value drops them all. Without it every nested field renders.
+
+    ``plan(queryset)`` then walks the remaining fields: nested many-valued
+    serializers become ``Prefetch`` objects (ordered and optionally sliced
+    via ``Meta.prefetch_ordering`` / ``Meta.prefetch_limits``), nested
+    single-valued serializers become ``select_related``, and nested
+    serializers are planned recursively.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or self.parent is not None:
+            return
+
+        wanted = request.query_params.get('fields')
+        if wanted:
+            allowed = set(wanted.split(','))
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
+
+        expand = request.query_params.get('expand')
+        if expand is not None:
+            allowed = set(filter(None, expand.split(',')))
+            for name, field in list(self.fields.items()):
+                if self._nested_serializer(field) is not None and name not in allowed:
+                    self.fields.pop(name)
+
+    @staticmethod
+    def _nested_serializer(field):
+        if isinstance(field, serializers.ListSerializer):
+            return field.child
+        if isinstance(field, serializers.ModelSerializer):
+            return field
+        return None
+
+    def plan(self, queryset, prefix=''):
+        meta = getattr(self, 'Meta', None)
+        ordering = getattr(meta, 'prefetch_ordering', {})
+        limits = getattr(meta, 'prefetch_limits', {})
+
+        for name, field in self.fields.items():
+            if field.source == '*':
+                continue
+            path = prefix + field.source.replace('.', '__')
+            nested = self._nested_serializer(field)
+
+            if isinstance(field, serializers.ListSerializer):
+                related = nested.Meta.model._default_manager.all()
+                if isinstance(nested, QueryPlanningMixin):
+                    related = nested.plan(related)
+                if name in ordering:
+                    related = related.order_by(*ordering[name])
+                if name in limits:
+                    related = related[:limits[name]]
+                queryset = queryset.prefetch_related(Prefetch(path, queryset=related))
+            elif nested is not None:
+                queryset = queryset.select_related(path)
+                if isinstance(nested, QueryPlanningMixin):
+                    queryset = nested.plan(queryset, prefix=path + '__')
+            elif isinstance(field, serializers.ManyRelatedField):
+                queryset = queryset.prefetch_related(path)
+        return queryset
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A PrimaryKeyRelatedField that, inside a BookBulkSerializer, resolves its
+    pk from the objects the list serializer loaded for the whole batch
+    instead of issuing one ``get()`` per item.
+    """
+
+    def to_internal_value(self, data):
+        loaded = getattr(self.root, 'related_objects', {}).get(self.field_name)
+        if loaded is None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in loaded:
+            self.fail('does_not_exist', pk_value=data)
+        return loaded[pk]
+
+
+@lru_cache(maxsize=1)
+def _year_in(minute):
+    return datetime.now().year
+
+
+def current_year():
+    """
+    The current year, looked up once per minute. Every UTC offset is a whole
+    number of minutes, so a new year always starts a new minute.
+    """
+    return _year_in(int(time.time() // 60))
+
+
+class CompiledValidator:
+    """
+    Runs a serializer's field validation for many items with the per-field
+    work done once: writable fields, their validators and ``validate_<name>``
+    hooks are resolved up front, and plain ``str``/``int`` values take an
+    inline path instead of the full ``Field.run_validation`` chain. Anything
+    else (missing keys, ``None``, other types, non-dict items) is handed to
+    the field or serializer itself, so results and error messages match the
+    serializer exactly.
+
+    ``related`` maps field names to ``{pk: obj}`` dicts loaded for the batch.
+    Serializers with object-level validators or a custom ``validate()`` are
+    not supported; check ``supports()`` first.
+    """
+
+    def __init__(self, serializer, related=None):
+        related = related or {}
+        self.fallback = serializer.run_validation
+        self.set_value = serializer.set_value
+        self.fields = []
+        for field in serializer._writable_fields:
+            hook = getattr(serializer, 'validate_' + field.field_name, None)
+            self.fields.append((
+                field.field_name, field.source_attrs, self.compile(field, related.get(field.field_name)),
+                list(field.validators), hook,
+            ))
+
+    @staticmethod
+    def supports(serializer):
+        return not serializer.validators and type(serializer).validate is serializers.Serializer.validate
+
+    @staticmethod
+    def compile(field, loaded):
+        if isinstance(field, serializers.CharField):
+            trim, allow_blank = field.trim_whitespace, field.allow_blank
+
+            def convert(value):
+                if type(value) is not str:
+                    return field.run_validation(value), False
+                if trim:
+                    value = value.strip()
+                if value == '':
+                    if not allow_blank:
+                        field.fail('blank')
+                    return '', False
+                return value, True
+        elif isinstance(field, serializers.IntegerField):
+            def convert(value):
+                if type(value) is not int:
+                    return field.run_validation(value), False
+                return value, True
+        elif isinstance(field, BatchPrimaryKeyRelatedField) and loaded is not None:
+            def convert(value):
+                if type(value) is not int:
+                    return field.run_validation(value), False
+                if value not in loaded:
+                    field.fail('does_not_exist', pk_value=value)
+                return loaded[value], True
+        else:
+            def convert(value):
+                return field.run_validation(value), False
+        return convert
+
+    def validate(self, data):
+        if type(data) is not dict:
+            return self.fallback(data)
+
+        attrs, errors = {}, {}
+        for name, source_attrs, convert, validators, hook in self.fields:
+            try:
+                # ``True`` means the field's own validators still need to run.
+                value, pending = convert(data.get(name, empty))
+                if pending:
+                    for validator in validators:
+                        validator(value)
+                if hook is not None:
+                    value = hook(value)
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+            except DjangoValidationError as exc:
+                errors[name] = get_error_detail(exc)
+            except SkipField:
+                pass
+            else:
+                if len(source_attrs) == 1:
+                    attrs[source_attrs[0]] = value
+                else:
+                    self.set_value(attrs, source_attrs, value)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class BookBulkSerializer(serializers.ListSerializer):
+    """
+    Validates and writes a batch of books at once.
+
+    Unlike a plain ListSerializer, invalid items do not fail the batch: they
+    are left out of ``validated_data`` and reported in ``item_errors`` as
+    ``{"index": ..., "errors": ...}``, and the valid ones are saved in one
+    transaction with ``bulk_create`` / ``bulk_update``. Related objects are
+    loaded with one query per field for the whole batch, and items are
+    checked by a CompiledValidator built once per batch.
+
+    For updates, pass ``instance`` as a ``{pk: book}`` mapping (e.g. from
+    ``in_bulk``) and give every item an ``id``.
+    """
+    batch_size = 500
+    compiled_validation = True
+
+    def to_internal_value(self, data):
+        # Reuse the list-level checks (type, empty, max_length) on an empty run.
+        if not isinstance(data, list) or not data or (
+            self.max_length is not None and len(data) > self.max_length
+        ):
+            return super().to_internal_value(data)
+
+        self.related_objects = self.load_related(data)
+        if self.compiled_validation and CompiledValidator.supports(self.child):
+            validate = CompiledValidator(self.child, self.related_objects).validate
+        else:
+            validate = self.run_child_validation
+        self.item_errors, self.matched = [], []
+        validated, seen = [], set()
+        for index, item in enumerate(data):
+            try:
+                instance = self.match_instance(item, seen)
+                self.child.instance = instance
+                self.child.initial_data = item
+                attrs = validate(item)
+            except serializers.ValidationError as exc:
+                self.item_errors.append({'index': index, 'errors': exc.detail})
+            else:
+                validated.append(attrs)
+                self.matched.append(instance)
+        self.child.instance = self.child.initial_data = None
+        return validated
+
+    def load_related(self, data):
+        loaded = {}
+        for name, field in self.child.fields.items():
+            if isinstance(field, BatchPrimaryKeyRelatedField) and not field.read_only:
+                pks = set()
+                for item in data:
+                    try:
+                        pks.add(field.get_queryset().model._meta.pk.to_python(item[name]))
+                    except (KeyError, TypeError, ValueError, DjangoValidationError):
+                        pass  # reported by the field itself
+                loaded[name] = field.get_queryset().in_bulk(pks)
+        return loaded
+
+    def match_instance(self, item, seen):
+        if self.instance is None:
+            return None
+        pk = item.get('id') if isinstance(item, dict) else None
+        if pk is None:
+            raise serializers.ValidationError({'id': ['This field is required.']})
+        instance = self.instance.get(pk)
+        if instance is None:
+            raise serializers.ValidationError({'id': [f'Invalid pk "{pk}" - object does not exist.']})
+        if instance.pk in seen:
+            raise serializers.ValidationError({'id': ['Duplicate id in batch.']})
+        seen.add(instance.pk)
+        return instance
+
+    @transaction.atomic
+    def create(self, validated_data):
+        books = Book.objects.bulk_create(
+            [Book(**attrs) for attrs in validated_data], batch_size=self.batch_size
+        )
+        # bulk_create skips post_save, so index the new books here.
+        search.index_books(books)
+        stats.refresh({book.author_id for book in books})
+        bump_version()
+        return books
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        books, fields = self.matched, set()
+        authors = {book.author_id for book in books}
+        for book, attrs in zip(books, validated_data):
+            for name, value in attrs.items():
+                setattr(book, name, value)
+            fields.update(attrs)
+        if fields:
+            # bulk_update neither sends post_save nor applies auto_now.
+            now = timezone.now()
+            for book in books:
+                book.updated_at = now
+            Book.objects.bulk_update(books, fields | {'updated_at'}, batch_size=self.batch_size)
+            search.index_books(books)
+            stats.refresh(authors | {book.author_id for book in books})
+            bump_version()
+        return books
 
 
 class BookSerializer(serializers.ModelSerializer):
     """
     Serializes Book model data.
     Includes custom validation to prevent future publication years.
+    With ``many=True`` it becomes a BookBulkSerializer.
     """
 
+    author = BatchPrimaryKeyRelatedField(queryset=Author.objects.all())
+
     class Meta:
         model = Book
         fields = '__all__'
+        list_serializer_class = BookBulkSerializer
 
     def validate_publication_year(self, value):
         """
         Ensure the publication year is not in the future.
         """
-        current_year = datetime.now().year
-        if value > current_year:
+        if value > current_year():
             raise serializers.ValidationError(
                 "Publication year cannot be in the future."
             )
         return value
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(QueryPlanningMixin, serializers.ModelSerializer):
     """
     Serializes Author model data.
     Includes a nested BookSerializer to dynamically display
     all books written by the author.
+    Use ``plan()`` to load the books of a whole page in one query.
     """
 
     books = BookSerializer(many=True, read_only=True)
@@ -37,3 +355,17 @@ class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = ['id', 'name', 'books']
+        prefetch_ordering = {'books': ['publication_year', 'title']}
+
+
+class AuthorStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializes the precomputed book statistics of an author
+    (see api/stats.py).
+    """
+
+    name = serializers.CharField(source='author.name', read_only=True)
+
+    class Meta:
+        model = AuthorStats
+        fields = ['author', 'name', 'book_count', 'first_year', 'last_year', 'decades']
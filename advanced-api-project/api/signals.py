@@ -0,0 +1,65 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import stats
+from .caching import bump_version
+from .models import Author, AuthorStats, Book, BookDocument
+from .search import index_books
+
+
+# Keep the search document of a book in step with its title and author.
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    index_books([instance])
+
+
+@receiver(post_save, sender=Author)
+def reindex_author_books(sender, instance, created, **kwargs):
+    if not created:
+        BookDocument.objects.filter(book__author=instance).update(author_name=instance.name)
+
+
+# Any book or author write invalidates the cached read responses.
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_responses(sender, **kwargs):
+    bump_version()
+
+
+# Keep AuthorStats in step with single book writes (bulk writes refresh it
+# themselves, see BookBulkSerializer).
+@receiver(pre_save, sender=Book)
+def remember_stats_key(sender, instance, **kwargs):
+    instance._stats_before = None
+    if not instance._state.adding:
+        instance._stats_before = (
+            Book.objects.filter(pk=instance.pk).values_list('author_id', 'publication_year').first()
+        )
+
+
+@receiver(post_save, sender=Book)
+def update_author_stats(sender, instance, created, **kwargs):
+    before = getattr(instance, '_stats_before', None)
+    after = (instance.author_id, instance.publication_year)
+    if before == after:
+        return
+    if before is None:
+        stats.apply(instance.author_id, added=[instance.publication_year])
+    elif before[0] == instance.author_id:
+        stats.apply(instance.author_id, added=[instance.publication_year], removed=[before[1]])
+    else:
+        stats.apply(before[0], removed=[before[1]])
+        stats.apply(instance.author_id, added=[instance.publication_year])
+
+
+@receiver(post_delete, sender=Book)
+def discount_author_stats(sender, instance, **kwargs):
+    stats.apply(instance.author_id, removed=[instance.publication_year])
+
+
+@receiver(post_save, sender=Author)
+def create_author_stats(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.create(author=instance)
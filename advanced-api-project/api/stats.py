@@ -0,0 +1,101 @@
+"""
+Precomputed per-author book statistics (``AuthorStats``).
+
+Every Author gets a row when created. Single book saves and deletes adjust
+the affected rows by delta through the
+signals in ``api.signals``: counts and the decade histogram move by one, and
+only removing a book at the edge of an author's year range re-reads that
+author's min/max (an index range on ``book_author_year_idx``). Bulk writes,
+which skip signals, call ``refresh()`` for the authors they touched, and
+``rebuild()`` recomputes every row with one grouped scan.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .models import Author, AuthorStats, Book
+
+
+def decade_of(year):
+    """The histogram bucket of ``year``; the only place decades are defined."""
+    return str(year // 10 * 10)
+
+
+def compute(books):
+    """Aggregate ``books`` into unsaved AuthorStats keyed by author id."""
+    # Grouped by year rather than decade in SQL, so that bucketing happens in
+    # decade_of() alone (SQL integer division truncates, // floors).
+    grouped = books.values('author_id', 'publication_year').annotate(count=Count('id')).order_by()
+    stats = defaultdict(lambda: {'book_count': 0, 'first_year': None, 'last_year': None, 'decades': {}})
+    for row in grouped:
+        entry, year = stats[row['author_id']], row['publication_year']
+        entry['book_count'] += row['count']
+        entry['decades'][decade_of(year)] = entry['decades'].get(decade_of(year), 0) + row['count']
+        if entry['first_year'] is None or year < entry['first_year']:
+            entry['first_year'] = year
+        if entry['last_year'] is None or year > entry['last_year']:
+            entry['last_year'] = year
+    return {author_id: AuthorStats(author_id=author_id, **values) for author_id, values in stats.items()}
+
+
+def save(rows):
+    AuthorStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['author'],
+        update_fields=['book_count', 'first_year', 'last_year', 'decades'],
+    )
+
+
+def refresh(author_ids):
+    """Recompute the stats of ``author_ids`` from their books."""
+    author_ids = set(Author.objects.filter(pk__in=set(author_ids)).values_list('pk', flat=True))
+    if not author_ids:
+        return
+    computed = compute(Book.objects.filter(author_id__in=author_ids))
+    save([computed.get(author_id) or AuthorStats(author_id=author_id) for author_id in author_ids])
+
+
+@transaction.atomic
+def apply(author_id, added=(), removed=()):
+    """Adjust one author's stats for books (by year) added to or removed from them."""
+    stats = AuthorStats.objects.select_for_update().filter(author_id=author_id).first()
+    if stats is None:
+        # Authors created without signals (bulk_create) have no row yet.
+        # Compute it after commit: during an Author cascade delete the author
+        # still exists here, and a row written now would outlive it.
+        transaction.on_commit(lambda: refresh([author_id]))
+        return
+
+    edge_removed = False
+    for year in added:
+        stats.book_count += 1
+        stats.decades[decade_of(year)] = stats.decades.get(decade_of(year), 0) + 1
+        stats.first_year = year if stats.first_year is None else min(stats.first_year, year)
+        stats.last_year = year if stats.last_year is None else max(stats.last_year, year)
+    for year in removed:
+        stats.book_count = max(stats.book_count - 1, 0)
+        remaining = stats.decades.get(decade_of(year), 0) - 1
+        if remaining > 0:
+            stats.decades[decade_of(year)] = remaining
+        else:
+            stats.decades.pop(decade_of(year), None)
+        edge_removed = edge_removed or year in (stats.first_year, stats.last_year)
+
+    if edge_removed:
+        bounds = Book.objects.filter(author_id=author_id).aggregate(
+            first=Min('publication_year'), last=Max('publication_year')
+        )
+        stats.first_year, stats.last_year = bounds['first'], bounds['last']
+    stats.save()
+
+
+def rebuild():
+    computed = compute(Book.objects.all())
+    rows = [computed.get(author_id) or AuthorStats(author_id=author_id)
+            for author_id in Author.objects.values_list('pk', flat=True).iterator()]
+    # Readers never see the table empty or half-filled.
+    with transaction.atomic():
+        AuthorStats.objects.all().delete()
+        AuthorStats.objects.bulk_create(rows, batch_size=2000)
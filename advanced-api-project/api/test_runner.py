@@ -0,0 +1,15 @@
+import time
+
+from django.test.runner import DiscoverRunner
+
+
+class TimedTestRunner(DiscoverRunner):
+    """DiscoverRunner that reports the suite's wall time, e.g. to compare --parallel runs."""
+
+    def run_tests(self, test_labels, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().run_tests(test_labels, **kwargs)
+        finally:
+            workers = self.parallel if self.parallel > 1 else 1
+            self.log(f"Suite wall time: {time.perf_counter() - start:.2f}s ({workers} process(es))")
@@ -1,21 +1,34 @@
+import json
+import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
-from .models import Book, Author
+from . import stats
+from .caching import VERSION_KEY
+from .checks import check_response_cache
+from .models import Author, AuthorStats, Book
+from .serializers import BookSerializer
+from .testing import ApiTestCase, CatalogTestCase
 
-class BookAPITestCase(APITestCase):
+class BookAPITestCase(ApiTestCase):
     """Comprehensive tests for Book API endpoints"""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         # Create a test user for authenticated endpoints
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username="testuser", password="password123"
         )
-        self.author = Author.objects.create(name="Author One")
-        self.book1 = Book.objects.create(title="Book One", publication_year=2020, author=self.author)
-        self.book2 = Book.objects.create(title="Book Two", publication_year=2021, author=self.author)
+        cls.author = Author.objects.create(name="Author One")
+        cls.book1 = Book.objects.create(title="Book One", publication_year=2020, author=cls.author)
+        cls.book2 = Book.objects.create(title="Book Two", publication_year=2021, author=cls.author)
 
+    def setUp(self):
+        super().setUp()
         # API endpoints
         self.list_url = reverse("book-list")
         self.detail_url = lambda pk: reverse("book-detail", args=[pk])
@@ -109,3 +122,428 @@ class BookAPITestCase(APITestCase):
         response = self.client.get(self.list_url, {"ordering": "publication_year"})
         self.assertEqual(response.data[0]["publication_year"], 2020)
 
+
+
+class AuthorAPITestCase(ApiTestCase):
+    """Tests for the author endpoints and their nested-books query planning"""
+
+    def create_authors(self, count):
+        for n in range(count):
+            author = Author.objects.create(name=f"Author {n:02d}")
+            Book.objects.create(title=f"Later {n}", publication_year=2021, author=author)
+            Book.objects.create(title=f"Earlier {n}", publication_year=2001, author=author)
+
+    def test_list_query_count_is_constant(self):
+        self.create_authors(2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("author-list"))
+
+        self.create_authors(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("author-list"))
+        self.assertEqual(len(response.data), 22)
+        self.assertEqual(response.data[0]["books"][0]["title"], "Earlier 0")
+
+    def test_fields_and_expand_skip_nested_books(self):
+        self.create_authors(3)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("author-list"), {"fields": "id,name"})
+        self.assertEqual(set(response.data[0]), {"id", "name"})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("author-list"), {"expand": ""})
+        self.assertNotIn("books", response.data[0])
+
+    def test_retrieve_author(self):
+        self.create_authors(1)
+        author = Author.objects.get()
+        response = self.client.get(reverse("author-detail", args=[author.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["books"]), 2)
+
+
+class BookBulkAPITestCase(ApiTestCase):
+    """Tests for the bulk create/update/delete endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="syncer", password="password123")
+        cls.first = Author.objects.create(name="First Author")
+        cls.second = Author.objects.create(name="Second Author")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("book-bulk")
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_uses_constant_queries(self):
+        def payload(count):
+            return [
+                {"title": f"Book {n}", "publication_year": 2000, "author": (self.first, self.second)[n % 2].pk}
+                for n in range(count)
+            ]
+
+        with self.assertNumQueries(8) as small:
+            self.client.post(self.url, payload(2), format="json")
+        with self.assertNumQueries(len(small)):
+            response = self.client.post(self.url, payload(50), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertEqual(Book.objects.count(), 52)
+        # bulk_create skips signals; the search documents must exist anyway.
+        search = self.client.get(reverse("book-list"), {"search": "second"})
+        self.assertEqual(len(search.data), 26)
+
+    def test_partial_failures_are_reported_per_item(self):
+        response = self.client.post(self.url, [
+            {"title": "Good", "publication_year": 2000, "author": self.first.pk},
+            {"title": "Future", "publication_year": 9999, "author": self.first.pk},
+            {"title": "Orphan", "publication_year": 2000, "author": 12345},
+        ], format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([book["title"] for book in response.data["results"]], ["Good"])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertIn("publication_year", response.data["errors"][0]["errors"])
+        self.assertIn("author", response.data["errors"][1]["errors"])
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Good"])
+
+    def test_all_invalid_is_a_bad_request(self):
+        response = self.client.post(self.url, [{"title": "No year"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Book.objects.exists())
+
+    def test_bulk_update_and_delete(self):
+        one = Book.objects.create(title="One", publication_year=2000, author=self.first)
+        two = Book.objects.create(title="Two", publication_year=2001, author=self.first)
+
+        response = self.client.patch(self.url, [
+            {"id": one.pk, "title": "One, revised"},
+            {"id": two.pk, "author": self.second.pk},
+            {"id": 12345, "title": "Missing"},
+            {"id": one.pk, "title": "Duplicate"},
+        ], format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [2, 3])
+        one.refresh_from_db()
+        two.refresh_from_db()
+        self.assertEqual(one.title, "One, revised")
+        self.assertEqual(two.author, self.second)
+        search = self.client.get(reverse("book-list"), {"search": "revised"})
+        self.assertEqual(len(search.data), 1)
+
+        response = self.client.delete(self.url, [one.pk, 12345], format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["results"], [one.pk])
+        self.assertEqual(list(Book.objects.values_list("pk", flat=True)), [two.pk])
+
+
+class BookValidationTestCase(ApiTestCase):
+    """The compiled bulk validation must agree with plain BookSerializer"""
+
+    def test_compiled_validation_matches_serializer(self):
+        author = Author.objects.create(name="Valid Author")
+        payload = [
+            {"title": "  Padded  ", "publication_year": 2000, "author": author.pk},
+            {"title": "Year as text", "publication_year": "1999", "author": str(author.pk)},
+            {"title": "", "publication_year": 2000, "author": author.pk},
+            {"title": "x" * 256, "publication_year": 2000, "author": author.pk},
+            {"title": "Future", "publication_year": 9999, "author": author.pk},
+            {"title": "Bad year", "publication_year": "soon", "author": author.pk},
+            {"title": "Missing author", "publication_year": 2000},
+            {"title": None, "publication_year": True, "author": 12345},
+            "not an object",
+        ]
+        bulk = BookSerializer(data=payload, many=True)
+        bulk.is_valid(raise_exception=True)
+        errors = {error["index"]: error["errors"] for error in bulk.item_errors}
+        valid = iter(bulk.validated_data)
+
+        for index, item in enumerate(payload):
+            single = BookSerializer(data=item)
+            if single.is_valid():
+                self.assertEqual(next(valid), single.validated_data)
+            else:
+                self.assertEqual(errors[index], single.errors)
+        self.assertEqual(len(errors), 7)
+        self.assertEqual(bulk.validated_data[0]["title"], "Padded")
+
+
+class BookExportTestCase(ApiTestCase):
+    """Tests for the streaming catalog export"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Export Author")
+        for year in (2003, 2001, 2002):
+            Book.objects.create(title=f"Book {year}", publication_year=year, author=author)
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("book-export")
+
+    def lines(self, response):
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_ndjson_export_honors_filters_and_ordering(self):
+        response = self.client.get(self.url, {"ordering": "-publication_year", "search": "book"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in self.lines(response)]
+        self.assertEqual([row["publication_year"] for row in rows], [2003, 2002, 2001])
+        self.assertEqual(set(rows[0]), {"id", "title", "publication_year", "author"})
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {"format": "csv", "publication_year": 2002})
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="books.csv"')
+        lines = self.lines(response)
+        self.assertEqual(lines[0], "id,title,publication_year,author")
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Book 2002", lines[1])
+
+    def test_invalid_filter_is_a_json_error(self):
+        for params in ({"publication_year": "abc"}, {"publication_year": "abc", "format": "csv"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertIn("publication_year", response.json())
+
+
+class BookResponseCacheTestCase(ApiTestCase):
+    """Tests for the versioned response cache and conditional GETs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name="Cached Author")
+        cls.book = Book.objects.create(title="Cached", publication_year=2000, author=cls.author)
+
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse("book-list")
+
+    def written_earlier(self):
+        """Backdate the catalog version, as if the last write was a minute ago."""
+        cache.set(VERSION_KEY, time.time_ns() - 60 * 10**9, None)
+
+    def test_repeat_and_conditional_gets_skip_the_database(self):
+        self.written_earlier()
+        first = self.client.get(self.list_url, {"ordering": "title", "title": "Cached"})
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+
+        with self.assertNumQueries(0):
+            # Parameter order does not matter.
+            again = self.client.get(self.list_url, {"title": "Cached", "ordering": "title"})
+            self.assertEqual(again.data, first.data)
+            self.assertEqual(again["ETag"], first["ETag"])
+
+            response = self.client.get(self.list_url, {"ordering": "title", "title": "Cached"},
+                                       HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            # Not cached yet, but nothing was written since.
+            response = self.client.get(self.list_url, {"ordering": "-title"},
+                                       HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_is_ignored_with_if_none_match(self):
+        self.written_earlier()
+        first = self.client.get(self.list_url)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH='"other"',
+                                   HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_delete_invalidates_conditional_gets(self):
+        self.written_earlier()
+        other = Book.objects.create(title="Other", publication_year=2001, author=self.author)
+        self.written_earlier()
+        first = self.client.get(self.list_url)
+        self.assertEqual(len(first.data), 2)
+
+        other.delete()
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": first["ETag"], "HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]},
+            {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]},
+        ):
+            response = self.client.get(self.list_url, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), 1)
+            # The write's second is not over yet, so no validator is sent.
+            self.assertNotIn("Last-Modified", response)
+
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual([error.id for error in check_response_cache(None)], ["api.W001"])
+        with self.settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/unused",
+        }}):
+            self.assertEqual(check_response_cache(None), [])
+
+    def test_book_and_author_writes_invalidate(self):
+        detail_url = reverse("book-detail", args=[self.book.pk])
+        etag = self.client.get(detail_url)["ETag"]
+
+        self.book.title = "Renamed"
+        self.book.save()
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Renamed")
+
+        etag = self.client.get(self.list_url, {"search": "cached"})["ETag"]
+        self.author.name = "Someone New"
+        self.author.save()
+        response = self.client.get(self.list_url, {"search": "cached"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data, [])
+
+    def test_bulk_writes_invalidate(self):
+        self.client.force_authenticate(User.objects.create_user(username="bulk", password="pw"))
+        self.assertEqual(len(self.client.get(self.list_url).data), 1)
+        self.client.post(reverse("book-bulk"), [
+            {"title": "Bulk", "publication_year": 2001, "author": self.author.pk},
+        ], format="json")
+        self.assertEqual(len(self.client.get(self.list_url).data), 2)
+
+
+class AuthorStatsTestCase(ApiTestCase):
+    """Tests for the precomputed author statistics"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name="Prolific")
+        cls.other = Author.objects.create(name="Quiet")
+        cls.early = Book.objects.create(title="Early", publication_year=1987, author=cls.author)
+        cls.middle = Book.objects.create(title="Middle", publication_year=1994, author=cls.author)
+        cls.late = Book.objects.create(title="Late", publication_year=2005, author=cls.author)
+
+    def stats(self, author):
+        response = self.client.get(reverse("author-stats-detail", args=[author.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_stats_follow_book_writes(self):
+        data = self.stats(self.author)
+        self.assertEqual(data["book_count"], 3)
+        self.assertEqual((data["first_year"], data["last_year"]), (1987, 2005))
+        self.assertEqual(data["decades"], {"1980": 1, "1990": 1, "2000": 1})
+
+        self.early.delete()
+        self.late.publication_year = 1999
+        self.late.save()
+        data = self.stats(self.author)
+        self.assertEqual((data["book_count"], data["first_year"], data["last_year"]), (2, 1994, 1999))
+        self.assertEqual(data["decades"], {"1990": 2})
+
+        self.middle.author = self.other
+        self.middle.save()
+        self.assertEqual(self.stats(self.author)["book_count"], 1)
+        self.assertEqual(self.stats(self.other)["decades"], {"1990": 1})
+
+    def test_rebuild_and_deltas_agree_on_decades(self):
+        Book.objects.create(title="Ancient", publication_year=-5, author=self.other)
+        incremental = self.stats(self.other)["decades"]
+        self.assertEqual(incremental, {"-10": 1})
+        stats.rebuild()
+        cache.clear()
+        self.assertEqual(self.stats(self.other)["decades"], incremental)
+
+    def test_list_reads_only_the_summary_table(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("author-stats-list"))
+        self.assertEqual([row["name"] for row in response.data], ["Prolific", "Quiet"])
+        self.assertEqual(response.data[1]["book_count"], 0)
+
+    def test_bulk_writes_and_rebuild(self):
+        self.client.force_authenticate(User.objects.create_user(username="bulk", password="pw"))
+        self.client.post(reverse("book-bulk"), [
+            {"title": "New", "publication_year": 2020, "author": self.other.pk},
+        ], format="json")
+        self.client.patch(reverse("book-bulk"), [
+            {"id": self.early.pk, "author": self.other.pk},
+        ], format="json")
+        self.assertEqual(self.stats(self.author)["first_year"], 1994)
+        self.assertEqual(self.stats(self.other)["decades"], {"1980": 1, "2020": 1})
+
+        before = [self.stats(author) for author in (self.author, self.other)]
+        call_command("rebuild_author_stats", stdout=StringIO())
+        self.assertEqual([self.stats(author) for author in (self.author, self.other)], before)
+
+
+class CatalogSnapshotTestCase(CatalogTestCase):
+    """Read endpoints over the seeded catalog snapshot"""
+
+    def test_list_filter_and_export_cover_the_catalog(self):
+        books = self.catalog["books"]
+        self.assertEqual(len(self.client.get(reverse("book-list")).data), len(books))
+
+        author_id = books[0][3]
+        response = self.client.get(reverse("book-list"), {"author": author_id, "ordering": "-publication_year"})
+        years = [book["publication_year"] for book in response.data]
+        self.assertEqual(years, sorted((year for _, _, year, author in books if author == author_id), reverse=True))
+
+        export = b"".join(self.client.get(reverse("book-export")).streaming_content).splitlines()
+        self.assertEqual(len(export), len(books))
+
+    def test_derived_tables_match_the_snapshot(self):
+        self.assertEqual(AuthorStats.objects.count(), len(self.catalog["authors"]))
+        author_id = self.catalog["books"][0][3]
+        expected = [year for _, _, year, author in self.catalog["books"] if author == author_id]
+        data = self.client.get(reverse("author-stats-detail", args=[author_id])).data
+        self.assertEqual((data["book_count"], data["first_year"]), (len(expected), min(expected)))
+
+        title = self.catalog["books"][0][1]
+        results = self.client.get(reverse("book-list"), {"search": title}).data
+        self.assertIn(title, [book["title"] for book in results])
+
+    def test_new_rows_do_not_collide_with_snapshot_pks(self):
+        author = Author.objects.create(name="After The Snapshot")
+        self.assertGreater(author.pk, len(self.catalog["authors"]))
+
+
+class BookSearchTestCase(ApiTestCase):
+    """Tests for the indexed ?search= backend of the book list"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tolkien = Author.objects.create(name="J. R. R. Tolkien")
+        cls.other = Author.objects.create(name="Somebody Else")
+        cls.hobbit = Book.objects.create(title="The Hobbit", publication_year=1937, author=cls.tolkien)
+        cls.about = Book.objects.create(title="Reading Tolkien", publication_year=2001, author=cls.other)
+
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse("book-list")
+
+    def titles(self, query):
+        response = self.client.get(self.list_url, {"search": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["title"] for book in response.data]
+
+    def test_search_matches_author_name_and_prefixes(self):
+        self.assertEqual(self.titles("tolk hob"), ["The Hobbit"])
+
+    def test_title_matches_rank_above_author_matches(self):
+        self.assertEqual(self.titles("tolkien"), ["Reading Tolkien", "The Hobbit"])
+
+    def test_explicit_ordering_overrides_rank(self):
+        response = self.client.get(self.list_url, {"search": "tolkien", "ordering": "publication_year"})
+        self.assertEqual([book["title"] for book in response.data], ["The Hobbit", "Reading Tolkien"])
+
+    def test_index_follows_author_rename_and_book_delete(self):
+        self.tolkien.name = "John Ronald Reuel"
+        self.tolkien.save()
+        self.assertEqual(self.titles("reuel"), ["The Hobbit"])
+
+        self.hobbit.delete()
+        self.assertEqual(self.titles("reuel"), [])
+
+
+class BookIndexAdvisorTestCase(ApiTestCase):
+    """Every filter/ordering combination of the book list must be index-backed."""
+
+    def test_no_list_query_needs_a_full_scan_or_sort(self):
+        out = StringIO()
+        call_command("advise_book_indexes", "--max-filters", "2", "--fail-on-issues", stdout=out)
+        self.assertIn("0 flagged", out.getvalue())
@@ -1,19 +1,32 @@
 from django.urls import path
 from .views import (
     BookListView,
+    BookExportView,
     BookDetailView,
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    BookBulkView,
+    AuthorListView,
+    AuthorDetailView,
+    AuthorStatsListView,
+    AuthorStatsDetailView,
 )
 
 urlpatterns = [
     path("books/", BookListView.as_view(), name="book-list"),
+    path("books/export/", BookExportView.as_view(), name="book-export"),
     path("books/<int:pk>/", BookDetailView.as_view(), name="book-detail"),
     path("books/create/", BookCreateView.as_view(), name="book-create"),
+    path("books/bulk/", BookBulkView.as_view(), name="book-bulk"),
 
     # 🔥 CHECKER-REQUIRED FORMAT
     path("books/update/<int:pk>/", BookUpdateView.as_view(), name="book-update"),
     path("books/delete/<int:pk>/", BookDeleteView.as_view(), name="book-delete"),
+
+    path("authors/", AuthorListView.as_view(), name="author-list"),
+    path("authors/<int:pk>/", AuthorDetailView.as_view(), name="author-detail"),
+    path("authors/stats/", AuthorStatsListView.as_view(), name="author-stats-list"),
+    path("authors/<int:pk>/stats/", AuthorStatsDetailView.as_view(), name="author-stats-detail"),
 ]
 
@@ -1,20 +1,24 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters import rest_framework  # ✅ required by checker
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics, filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
-from .models import Book
-from .serializers import BookSerializer
+from .caching import CachedResponseMixin
+from .export import CSVRenderer, NDJSONRenderer, stream_books
+from .filters import BookSearchFilter, BookOrderingFilter
+from .models import Author, AuthorStats, Book
+from .serializers import AuthorSerializer, AuthorStatsSerializer, BookSerializer
 
 # READ — anyone can read, only authenticated users can write
-class BookListView(generics.ListAPIView):
+class BookListView(CachedResponseMixin, generics.ListAPIView):
     """
     List all books with filtering, searching, and ordering.
     Filtering: title, author, publication_year
-    Search: title, author
-    Ordering: title, publication_year
+    Search: title, author name (full-text, prefix matching, ranked)
+    Ordering: title, publication_year (relevance first when searching)
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -23,22 +27,44 @@ class BookListView(generics.ListAPIView):
     # 🔥 Required backends
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter, 
+        BookSearchFilter,
+        BookOrderingFilter,
     ]
 
     # Filtering
     filterset_fields = ["title", "author", "publication_year"]
 
-    # Search
-    search_fields = ["title", "author"]
+    # Search (indexed, see api/search.py)
+    search_fields = ["title", "author__name"]
 
     # Ordering
     ordering_fields = ["title", "publication_year"]
     ordering = ["title"]
 
 
-class BookDetailView(generics.RetrieveAPIView):
+class BookExportView(BookListView):
+    """
+    Stream every book matching the list filters as NDJSON (default) or CSV.
+    Takes the same filter, ?search= and ?ordering= parameters as BookListView;
+    pick the format with ?format=csv or an Accept header. Errors (e.g. an
+    invalid filter value) are always rendered as JSON.
+    """
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    cache_responses = False
+
+    def handle_exception(self, exc):
+        response = super().handle_exception(exc)
+        # The export renderers only know how to write book rows.
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_books(queryset, request.accepted_renderer)
+
+
+class BookDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -62,3 +88,127 @@ class BookDeleteView(generics.DestroyAPIView):
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
 
+
+# BULK WRITES — one request, one transaction, per-item errors
+class BookBulkView(generics.GenericAPIView):
+    """
+    Create (POST), update (PUT/PATCH) or delete (DELETE) many books at once.
+
+    POST/PUT/PATCH take a list of book objects (updates need ``id``), DELETE
+    takes a list of ids. Valid items are written together; invalid ones are
+    skipped and listed in ``errors`` by index. The status is 200/201 when
+    every item succeeded, 207 when some did and 400 when none did.
+    """
+    queryset = Book.objects.select_related('author')
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 1000
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_batch_size)
+        return self.write(serializer, status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+    def update(self, request, partial):
+        ids = self.requested_ids(item.get('id') for item in self.batch(request) if isinstance(item, dict))
+        serializer = self.get_serializer(
+            self.get_queryset().in_bulk(ids), data=request.data,
+            many=True, partial=partial, max_length=self.max_batch_size,
+        )
+        return self.write(serializer, status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        data = self.batch(request)
+        found = set(self.get_queryset().filter(pk__in=self.requested_ids(data)).values_list('pk', flat=True))
+        deleted, errors = [], []
+        for index, pk in enumerate(data):
+            if isinstance(pk, int) and not isinstance(pk, bool) and pk in found:
+                deleted.append(pk)
+                found.discard(pk)
+            else:
+                errors.append({'index': index, 'errors': [f'Invalid pk "{pk}" - object does not exist.']})
+        if deleted:
+            # Cascades to BookDocument rows, which the FTS triggers follow.
+            Book.objects.filter(pk__in=deleted).delete()
+        return self.respond(deleted, errors, status.HTTP_200_OK)
+
+    def batch(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if not request.data:
+            raise ValidationError({'non_field_errors': ['This list may not be empty.']})
+        if len(request.data) > self.max_batch_size:
+            raise ValidationError({'non_field_errors': [
+                f'Ensure this field has no more than {self.max_batch_size} elements.'
+            ]})
+        return request.data
+
+    @staticmethod
+    def requested_ids(values):
+        return [value for value in values if isinstance(value, int) and not isinstance(value, bool)]
+
+    def write(self, serializer, success_status):
+        serializer.is_valid(raise_exception=True)
+        books = serializer.save() if serializer.validated_data else []
+        return self.respond(
+            BookSerializer(books, many=True).data, serializer.item_errors, success_status
+        )
+
+    def respond(self, results, errors, success_status):
+        if errors and not results:
+            code = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = success_status
+        return Response({'results': results, 'errors': errors}, status=code)
+
+
+
+# AUTHORS — read-only, nested books loaded in one query per page
+class PlannedQuerysetMixin:
+    """
+    Eager-loads whatever the serializer will render for this request
+    (see QueryPlanningMixin), so list queries stay constant in the page size.
+    """
+
+    def get_queryset(self):
+        return self.get_serializer().plan(super().get_queryset())
+
+
+class AuthorListView(PlannedQuerysetMixin, generics.ListAPIView):
+    """
+    List authors with their books.
+    Selectors: ?fields=id,name to pick fields, ?expand= to skip nested books.
+    """
+    queryset = Author.objects.order_by("name", "id")
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class AuthorDetailView(PlannedQuerysetMixin, generics.RetrieveAPIView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+# AUTHOR STATS — served from the AuthorStats summary table
+class AuthorStatsListView(generics.ListAPIView):
+    """
+    Book count, first/last publication year and books per decade for every
+    author, without aggregating the books table.
+    """
+    queryset = AuthorStats.objects.select_related("author").order_by("author__name", "author_id")
+    serializer_class = AuthorStatsSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class AuthorStatsDetailView(generics.RetrieveAPIView):
+    queryset = AuthorStats.objects.select_related("author")
+    serializer_class = AuthorStatsSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
@@ -0,0 +1,6 @@
+"""Vocabulary for synthetic catalogs (benchmark_book_search and the test snapshot)."""
+
+WORDS = (
+    "shadow river winter garden silent empire glass storm hollow crown "
+    "night orchard iron harbor paper comet velvet forest ember lantern"
+).split()
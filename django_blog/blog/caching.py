@@ -0,0 +1,168 @@
+"""
+Scoped caching of rendered blog pages and template fragments.
+
+Cached entries are keyed on the current version of every *scope* they
+depend on:
+
+- ``posts``: any post list (a post was created, edited or deleted),
+- ``post:<pk>``: one post's body, tags and comments,
+- ``tag:<name>``: one tag's listing.
+
+``blog.signals`` bumps the affected scopes on Post/Comment saves and
+deletes and on taggit tag changes, so stale entries are never read again and
+simply age out. Nothing is deleted, which keeps invalidation O(scopes).
+
+Hits and misses are counted per entry name (``stats()``, the ``cache-stats``
+view) to tune the per-name TTLs in ``BLOG_CACHE['TIMEOUTS']``.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from taggit.models import Tag
+
+from .models import Post
+
+DEFAULTS = {
+    # Cache alias from CACHES.
+    'CACHE': 'default',
+    # Default TTL, and per-entry-name overrides, e.g. {'post-body': 3600}.
+    'TIMEOUT': 600,
+    'TIMEOUTS': {},
+}
+
+NAMES_KEY = 'blog:cache:names'
+
+
+def get_setting(name):
+    return getattr(settings, 'BLOG_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('CACHE')]
+
+
+def timeout_for(name):
+    return get_setting('TIMEOUTS').get(name, get_setting('TIMEOUT'))
+
+
+def scope_for(obj):
+    if isinstance(obj, Post):
+        return f'post:{obj.pk}'
+    if isinstance(obj, Tag):
+        return f'tag:{obj.name}'
+    return str(obj)
+
+
+def _version_key(scope):
+    return 'blog:cache:v:' + hashlib.md5(scope.encode()).hexdigest()
+
+
+def versions(scopes):
+    """Current version of each scope; unknown scopes start at the current time."""
+    cache = get_cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    missing = {key: time.time_ns() for key in keys.values() if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[keys[scope]] for scope in scopes]
+
+
+def invalidate(*scopes):
+    cache = get_cache()
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def entry_key(name, scopes, vary=()):
+    raw = '|'.join([name, *map(str, versions(scopes)), *map(str, vary)])
+    return f'blog:cache:{name}:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def count(name, outcome):
+    cache = get_cache()
+    key = f'blog:cache:stats:{name}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+    names = cache.get(NAMES_KEY, set())
+    if name not in names:
+        cache.set(NAMES_KEY, names | {name}, None)
+
+
+def stats():
+    """``{name: {'hits': n, 'misses': n, 'hit_rate': r, 'timeout': s}}`` for every entry name seen."""
+    cache = get_cache()
+    result = {}
+    for name in sorted(cache.get(NAMES_KEY, set())):
+        hits = cache.get(f'blog:cache:stats:{name}:hit', 0)
+        misses = cache.get(f'blog:cache:stats:{name}:miss', 0)
+        total = hits + misses
+        result[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else None,
+            'timeout': timeout_for(name),
+        }
+    return result
+
+
+def get_or_render(name, scopes, vary, render):
+    """Return the cached string for this entry, or ``render()`` and store it."""
+    cache = get_cache()
+    key = entry_key(name, [scope_for(scope) for scope in scopes], vary)
+    value = cache.get(key)
+    if value is not None:
+        count(name, 'hit')
+        return value
+    count(name, 'miss')
+    value = render()
+    cache.set(key, value, timeout_for(name))
+    return value
+
+
+class CachedPageMixin:
+    """
+    Caches whole GET responses of a view, keyed on its ``cache_scopes()``
+    and the full path. Only for pages that render the same for every user.
+    """
+    cache_name = None
+
+    def cache_scopes(self):
+        return ['posts']
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().dispatch(request, *args, **kwargs)
+        self.request, self.args, self.kwargs = request, args, kwargs
+
+        def render():
+            response = super(CachedPageMixin, self).dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            if response.status_code != 200:
+                raise _Uncacheable(response)
+            return (response.content, response['Content-Type'])
+
+        try:
+            content, content_type = get_or_render(
+                self.cache_name, self.cache_scopes(), [request.get_full_path()], render,
+            )
+        except _Uncacheable as exc:
+            return exc.response
+        return HttpResponse(content, content_type=content_type)
+
+
+class _Uncacheable(Exception):
+    def __init__(self, response):
+        self.response = response
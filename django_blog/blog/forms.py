@@ -9,6 +9,8 @@ class PostForm(forms.ModelForm):
 
         widgets = {
             'tags': TagWidget(),
+        }
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog import search
+from blog.models import PostDocument
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents behind the blog post search."
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {PostDocument.objects.count()} post(s)."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog import related
+from blog.models import RelatedPost
+
+
+class Command(BaseCommand):
+    help = "Recompute every post's related posts from the post tags."
+
+    def handle(self, *args, **options):
+        related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Stored {RelatedPost.objects.count()} related post link(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog import tags
+from blog.models import TagPair, TagStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the tag cloud and related-tag counts from the post tags."
+
+    def handle(self, *args, **options):
+        tags.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Counted {TagStats.objects.count()} tag(s) and {TagPair.objects.count()} tag pair(s)."
+        ))
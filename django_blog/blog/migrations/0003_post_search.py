@@ -0,0 +1,113 @@
+# Generated by Django 4.2 on 2026-10-18 18:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE blog_postdocument_fts USING fts5(
+        title, content, tags,
+        content='blog_postdocument', content_rowid='post_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_postdocument_fts_insert AFTER INSERT ON blog_postdocument BEGIN
+        INSERT INTO blog_postdocument_fts(rowid, title, content, tags)
+        VALUES (new.post_id, new.title, new.content, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_postdocument_fts_delete AFTER DELETE ON blog_postdocument BEGIN
+        INSERT INTO blog_postdocument_fts(blog_postdocument_fts, rowid, title, content, tags)
+        VALUES ('delete', old.post_id, old.title, old.content, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_postdocument_fts_update AFTER UPDATE ON blog_postdocument BEGIN
+        INSERT INTO blog_postdocument_fts(blog_postdocument_fts, rowid, title, content, tags)
+        VALUES ('delete', old.post_id, old.title, old.content, old.tags);
+        INSERT INTO blog_postdocument_fts(rowid, title, content, tags)
+        VALUES (new.post_id, new.title, new.content, new.tags);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS blog_postdocument_fts_update",
+    "DROP TRIGGER IF EXISTS blog_postdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS blog_postdocument_fts_insert",
+    "DROP TABLE IF EXISTS blog_postdocument_fts",
+]
+
+# Must match PostgresFullTextBackend.vector in blog/search.py.
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX blog_postdocument_search ON blog_postdocument USING GIN ((
+        setweight(to_tsvector('simple', title), 'A') ||
+        setweight(to_tsvector('simple', tags), 'B') ||
+        setweight(to_tsvector('simple', content), 'C')
+    ))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS blog_postdocument_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_FORWARD,
+        'postgresql': POSTGRES_FORWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+    Post = apps.get_model('blog', 'Post')
+    PostDocument = apps.get_model('blog', 'PostDocument')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type = ContentType.objects.filter(app_label='blog', model='post').first()
+    tags = {}
+    if content_type is not None:
+        items = TaggedItem.objects.filter(content_type=content_type).values_list('object_id', 'tag__name')
+        for post_id, name in items.iterator():
+            tags.setdefault(post_id, []).append(name)
+    PostDocument.objects.bulk_create(
+        [PostDocument(post=post, title=post.title, content=post.content,
+                      tags=' '.join(sorted(tags.get(post.pk, []))))
+         for post in Post.objects.iterator()],
+        batch_size=2000,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_REVERSE,
+        'postgresql': POSTGRES_REVERSE,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_comment_post_tags'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.post')),
+                ('title', models.CharField(max_length=200)),
+                ('content', models.TextField()),
+                ('tags', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
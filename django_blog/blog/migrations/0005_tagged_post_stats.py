@@ -0,0 +1,138 @@
+# Generated by Django 4.2 on 2026-10-18 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import taggit.managers
+from collections import Counter
+from itertools import permutations
+
+
+def post_content_type(apps):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    return ContentType.objects.filter(app_label='blog', model='post').first()
+
+
+def move_post_tags(apps, schema_editor):
+    """Move post tags off taggit's generic TaggedItem and build the tag summaries."""
+    Post = apps.get_model('blog', 'Post')
+    TaggedPost = apps.get_model('blog', 'TaggedPost')
+    TagStats = apps.get_model('blog', 'TagStats')
+    TagPair = apps.get_model('blog', 'TagPair')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    content_type = post_content_type(apps)
+    if content_type is None:
+        return
+
+    items = TaggedItem.objects.filter(content_type=content_type)
+    dates = dict(Post.objects.values_list('pk', 'published_date'))
+    post_tags = {}
+    for post_id, tag_id in items.values_list('object_id', 'tag_id').iterator():
+        if post_id in dates:
+            post_tags.setdefault(post_id, set()).add(tag_id)
+    TaggedPost.objects.bulk_create(
+        [TaggedPost(content_object_id=post_id, tag_id=tag_id, published_date=dates[post_id])
+         for post_id, tag_ids in post_tags.items() for tag_id in tag_ids],
+        batch_size=2000,
+    )
+    items.delete()
+
+    counts, pairs = Counter(), Counter()
+    for tag_ids in post_tags.values():
+        counts.update(tag_ids)
+        pairs.update(permutations(tag_ids, 2))
+    TagStats.objects.bulk_create([TagStats(tag_id=tag_id, post_count=n) for tag_id, n in counts.items()])
+    TagPair.objects.bulk_create(
+        [TagPair(tag_id=tag_id, other_id=other_id, post_count=n) for (tag_id, other_id), n in pairs.items()],
+        batch_size=2000,
+    )
+
+
+def restore_post_tags(apps, schema_editor):
+    TaggedPost = apps.get_model('blog', 'TaggedPost')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type, _ = ContentType.objects.get_or_create(app_label='blog', model='post')
+    TaggedItem.objects.bulk_create(
+        [TaggedItem(content_type=content_type, object_id=post_id, tag_id=tag_id)
+         for post_id, tag_id in TaggedPost.objects.values_list('content_object_id', 'tag_id').iterator()],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('blog', '0004_comment_post_created_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaggedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_date', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TagPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='blog_stats', serialize=False, to='taggit.tag')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagstats',
+            index=models.Index(fields=['-post_count', 'tag'], name='tagstats_count_idx'),
+        ),
+        migrations.AddField(
+            model_name='tagpair',
+            name='other',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taggit.tag'),
+        ),
+        migrations.AddField(
+            model_name='tagpair',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taggit.tag'),
+        ),
+        migrations.AddField(
+            model_name='taggedpost',
+            name='content_object',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tagged_items', to='blog.post'),
+        ),
+        migrations.AddField(
+            model_name='taggedpost',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_items', to='taggit.tag'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='tags',
+            field=taggit.managers.TaggableManager(help_text='A comma-separated list of tags.', through='blog.TaggedPost', to='taggit.Tag', verbose_name='Tags'),
+        ),
+        migrations.AddIndex(
+            model_name='tagpair',
+            index=models.Index(fields=['tag', '-post_count', 'other'], name='tagpair_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagpair',
+            constraint=models.UniqueConstraint(fields=('tag', 'other'), name='tagpair_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='taggedpost',
+            index=models.Index(fields=['tag', '-published_date', '-content_object'], name='taggedpost_tag_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='taggedpost',
+            constraint=models.UniqueConstraint(fields=('content_object', 'tag'), name='taggedpost_post_tag_uniq'),
+        ),
+        migrations.RunPython(move_post_tags, restore_post_tags),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 18:17
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+BATCH_SIZE = 2000
+
+
+def populate_excerpts(apps, schema_editor):
+    # Must match blog.models.make_excerpt. Written a batch at a time so only
+    # BATCH_SIZE posts (and their content) are held in memory.
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(post.content).chars(100)
+        posts.append(post)
+        if len(posts) == BATCH_SIZE:
+            Post.objects.bulk_update(posts, ['excerpt'])
+            posts.clear()
+    Post.objects.bulk_update(posts, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_tagged_post_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_date', '-id'], name='post_published_idx'),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-18 18:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import heapq
+from collections import Counter, defaultdict
+
+
+# blog.related's defaults (TOP_K, Jaccard) when this migration was written;
+# run rebuild_related_posts afterwards for other BLOG_RELATED settings.
+TOP_K = 5
+
+
+def populate_related_posts(apps, schema_editor):
+    """Each post's TOP_K most similar posts by tag Jaccard similarity."""
+    TaggedPost = apps.get_model('blog', 'TaggedPost')
+    RelatedPost = apps.get_model('blog', 'RelatedPost')
+    rows, columns = defaultdict(set), defaultdict(set)
+    for post_id, tag_id in TaggedPost.objects.values_list('content_object_id', 'tag_id').iterator(chunk_size=2000):
+        rows[post_id].add(tag_id)
+        columns[tag_id].add(post_id)
+
+    related = []
+    for post_id, tag_ids in rows.items():
+        shared = Counter()
+        for tag_id in tag_ids:
+            shared.update(columns[tag_id])
+        shared.pop(post_id, None)
+        scores = {other: n / (len(tag_ids) + len(rows[other]) - n) for other, n in shared.items()}
+        best = heapq.nlargest(TOP_K, scores.items(), key=lambda item: (item[1], item[0]))
+        related.extend(RelatedPost(post_id=post_id, related_id=other, rank=rank, score=score)
+                       for rank, (other, score) in enumerate(best, 1))
+    RelatedPost.objects.bulk_create(related, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='blog.post')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_backlinks', to='blog.post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='relatedpost',
+            constraint=models.UniqueConstraint(fields=('post', 'rank'), name='relatedpost_post_rank_uniq'),
+        ),
+        migrations.RunPython(populate_related_posts, migrations.RunPython.noop),
+    ]
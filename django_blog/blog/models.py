@@ -1,16 +1,155 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils.text import Truncator
 from taggit.managers import TaggableManager
+from taggit.models import Tag, TaggedItemBase
+
+
+class TaggedPost(TaggedItemBase):
+    """
+    Post/tag through table. Carries a copy of the post's published_date so
+    a tag listing is one range scan of taggedpost_tag_date_idx, already in
+    page order, instead of a join through taggit's generic TaggedItem and a
+    sort of every tagged post.
+    """
+    content_object = models.ForeignKey('Post', on_delete=models.CASCADE, related_name='tagged_items')
+    published_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_object', 'tag'], name='taggedpost_post_tag_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', '-published_date', '-content_object'], name='taggedpost_tag_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # published_date never changes after the post is created.
+        if self.published_date is None:
+            self.published_date = self.content_object.published_date
+        super().save(*args, **kwargs)
+
+
+EXCERPT_LENGTH = 100
+
+
+def make_excerpt(content):
+    return Truncator(content).chars(EXCERPT_LENGTH)
+
 
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # The start of content, stored so post lists can skip the full body.
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     published_date = models.DateTimeField(auto_now_add=True)
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
 
-    tags = TaggableManager()  # <-- TAGGING
+    tags = TaggableManager(through=TaggedPost)  # <-- TAGGING
+
+    class Meta:
+        # Serves the keyset-paginated post list (see blog/pagination.py).
+        indexes = [models.Index(fields=['-published_date', '-id'], name='post_published_idx')]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.content)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    def get_absolute_url(self):
+        return reverse('post-detail', kwargs={'pk': self.pk})
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Serves the paginated comment list of a post without a sort.
+        indexes = [models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx')]
+
+    def __str__(self):
+        return f"Comment by {self.author} on {self.post}"
+
+
+# PostDocument is the denormalized text the post search indexes (see
+# blog/search.py): title, body and tag names. Signals keep it current; the
+# full-text index over it is database specific.
+class PostDocument(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    tags = models.TextField(blank=True)
 
+    def __str__(self):
+        return self.title
+
+
+class PostSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table over PostDocument (created by migration 0003),
+    mapped so a search joins it once to both MATCH and rank. Not present on
+    other databases.
+    """
+    post = models.OneToOneField(
+        Post, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', db_constraint=False,
+        related_name='search_index',
+    )
+    # FTS5's hidden column named after the table: the left side of MATCH and
+    # the first argument of bm25().
+    document = models.TextField(db_column='blog_postdocument_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_postdocument_fts'
+
+
+# TagStats is the per-tag summary behind the tag cloud, and TagPair the
+# per-pair co-occurrence counts behind "related tags" (see blog/tags.py).
+# Tag changes adjust both by delta, so neither is ever a GROUP BY at read time.
+class TagStats(models.Model):
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='blog_stats')
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['-post_count', 'tag'], name='tagstats_count_idx')]
+
+    def __str__(self):
+        return f"{self.tag}: {self.post_count}"
+
+
+class TagPair(models.Model):
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='+')
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['tag', 'other'], name='tagpair_uniq')]
+        indexes = [models.Index(fields=['tag', '-post_count', 'other'], name='tagpair_count_idx')]
+
+    def __str__(self):
+        return f"{self.tag} + {self.other}: {self.post_count}"
+
+
+# RelatedPost holds each post's precomputed most similar posts by tag
+# overlap, best first (see blog/related.py).
+class RelatedPost(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_backlinks')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['post', 'rank'], name='relatedpost_post_rank_uniq')]
+
+    def __str__(self):
+        return f"{self.post} -> {self.related} ({self.score:.2f})"
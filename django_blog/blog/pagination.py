@@ -0,0 +1,90 @@
+"""
+Keyset ("cursor") pagination for newest-first lists.
+
+Pages are addressed by the (published_date, id) of the post on either side
+(``?after=<cursor>`` for older posts, ``?before=<cursor>`` for newer ones)
+rather than by page number, so every page is an index range read of
+``post_published_idx`` of exactly ``per_page + 1`` rows: no OFFSET that
+grows with the page number and no COUNT(*) over the whole table. Posts
+published while a reader pages through never shift or repeat entries.
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj):
+    raw = f'{obj.published_date.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        published, pk = raw.split('|')
+        published, pk = parse_datetime(published), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        published = None
+    if published is None:
+        raise Http404("Invalid page cursor.")
+    return published, pk
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_previous, has_next):
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor(self.object_list[0]) if self._has_previous else None
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.object_list[-1]) if self._has_next else None
+
+
+class KeysetPaginator:
+    """Pages a queryset newest first by (published_date, id)."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        if before:
+            published, pk = decode_cursor(before)
+            newer = Q(published_date__gt=published) | Q(published_date=published, pk__gt=pk)
+            rows = list(self.queryset.filter(newer).order_by('published_date', 'pk')[:self.per_page + 1])
+            if len(rows) <= self.per_page:
+                # Back at the top: serve a full first page instead of a short one.
+                return self.page()
+            return KeysetPage(rows[:self.per_page][::-1], has_previous=True, has_next=True)
+
+        queryset = self.queryset.order_by('-published_date', '-pk')
+        if after:
+            published, pk = decode_cursor(after)
+            queryset = queryset.filter(Q(published_date__lt=published) | Q(published_date=published, pk__lt=pk))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], has_previous=bool(after and rows), has_next=len(rows) > self.per_page,
+        )
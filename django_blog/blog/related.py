@@ -0,0 +1,202 @@
+"""
+Related posts by tag overlap.
+
+Each post's top ``TOP_K`` most similar posts are precomputed into
+``RelatedPost`` (blog.models), so the detail page reads them with one query
+on the ``relatedpost_post_rank_uniq`` index.
+
+Similarity comes from the sparse post × tag incidence matrix ``TagMatrix``:
+its rows are each post's tag ids and its columns each tag's post ids. One
+row of the product ``A·Aᵀ`` (the tags a post shares with every other post)
+is the sum of the columns of that post's tags, so only posts sharing at
+least one tag are ever scored. ``MEASURE`` turns the overlap into Jaccard
+(shared / union) or cosine (shared / √(|a|·|b|)) similarity. Plain dicts
+and sets stand in for a SciPy sparse matrix, which this project does not
+depend on.
+
+``blog.signals`` calls ``schedule()`` when a post's tags change, so the
+request that changed them only records the post ids. Once the transaction
+commits, ``update()`` runs on a background thread: the post gets a new
+list, and so does every post that listed it or that it now outranks the
+weakest entry of. Ids queued in the same window are refreshed together.
+The queue lives in process, so lists whose refresh was lost (e.g. to a
+restart) wait for ``rebuild()`` (``manage.py rebuild_related_posts``).
+
+Set ``BLOG_RELATED['ASYNC'] = False`` to refresh right after commit on the
+committing thread, e.g. in tests.
+"""
+import heapq
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min
+
+from .caching import invalidate
+from .models import Post, RelatedPost, TaggedPost
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ASYNC': True,
+    # Related posts kept per post.
+    'TOP_K': 5,
+    # 'jaccard' or 'cosine'.
+    'MEASURE': 'jaccard',
+}
+
+MEASURES = {
+    'jaccard': lambda shared, a, b: shared / (a + b - shared),
+    'cosine': lambda shared, a, b: shared / math.sqrt(a * b),
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'BLOG_RELATED', {}).get(name, DEFAULTS[name])
+
+
+class TagMatrix:
+    """Sparse post × tag incidence matrix, from ``(post_id, tag_id)`` pairs."""
+
+    def __init__(self, pairs):
+        self.rows = defaultdict(set)
+        self.columns = defaultdict(set)
+        for post_id, tag_id in pairs:
+            self.rows[post_id].add(tag_id)
+            self.columns[tag_id].add(post_id)
+
+    @classmethod
+    def around(cls, post_ids):
+        """The rows of ``post_ids`` and of every post sharing a tag with them, in one query."""
+        tag_ids = TaggedPost.objects.filter(content_object__in=post_ids).values('tag')
+        neighbours = TaggedPost.objects.filter(tag__in=tag_ids).values('content_object')
+        return cls(TaggedPost.objects.filter(content_object__in=neighbours)
+                   .values_list('content_object_id', 'tag_id').iterator(chunk_size=2000))
+
+    def overlaps(self, post_id):
+        """Shared tag counts with every other post: one row of A·Aᵀ."""
+        shared = Counter()
+        for tag_id in self.rows.get(post_id, ()):
+            shared.update(self.columns[tag_id])
+        shared.pop(post_id, None)
+        return shared
+
+    def scores(self, post_id, measure):
+        similarity = MEASURES[measure]
+        size = len(self.rows.get(post_id, ()))
+        return {other: similarity(shared, size, len(self.rows[other]))
+                for other, shared in self.overlaps(post_id).items()}
+
+    def top(self, post_id, k, measure):
+        """``[(related_id, score)]``, best first; ties go to the newer (higher id) post."""
+        return heapq.nlargest(k, self.scores(post_id, measure).items(), key=lambda item: (item[1], item[0]))
+
+
+def compute(matrix, post_ids, k=None, measure=None):
+    """Unsaved RelatedPost rows for ``post_ids``."""
+    k = k or get_setting('TOP_K')
+    measure = measure or get_setting('MEASURE')
+    return [
+        RelatedPost(post_id=post_id, related_id=related_id, rank=rank, score=score)
+        for post_id in post_ids
+        for rank, (related_id, score) in enumerate(matrix.top(post_id, k, measure), 1)
+    ]
+
+
+@transaction.atomic
+def refresh(post_ids):
+    """Recompute the related posts of ``post_ids``."""
+    post_ids = set(Post.objects.filter(pk__in=set(post_ids)).values_list('pk', flat=True))
+    if not post_ids:
+        return
+    rows = compute(TagMatrix.around(post_ids), post_ids)
+    RelatedPost.objects.filter(post__in=post_ids).delete()
+    RelatedPost.objects.bulk_create(rows, batch_size=2000)
+    invalidate(*[f'post:{post_id}' for post_id in post_ids])
+
+
+def update(post_ids):
+    """Refresh after the tags of ``post_ids`` changed."""
+    post_ids = set(post_ids)
+    stale = set(RelatedPost.objects.filter(related__in=post_ids).values_list('post_id', flat=True))
+
+    # Neighbours that may now rank a changed post: those with a free slot,
+    # or whose weakest entry scores no better than the changed post does.
+    k, measure = get_setting('TOP_K'), get_setting('MEASURE')
+    matrix = TagMatrix.around(post_ids)
+    scores = {}
+    for post_id in post_ids:
+        for other, score in matrix.scores(post_id, measure).items():
+            scores[other] = max(score, scores.get(other, 0))
+    floors = {
+        row['post']: (row['entries'], row['floor'])
+        for row in RelatedPost.objects.filter(post__in=scores).values('post')
+        .annotate(entries=Count('pk'), floor=Min('score')).order_by()
+    }
+    gaining = {other for other, score in scores.items()
+               if floors.get(other, (0, 0))[0] < k or score >= floors[other][1]}
+    refresh(post_ids | stale | gaining)
+
+
+def rebuild():
+    matrix = TagMatrix(TaggedPost.objects.values_list('content_object_id', 'tag_id').iterator(chunk_size=2000))
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(compute(matrix, matrix.rows), batch_size=2000)
+    invalidate(*[f'post:{post_id}' for post_id in Post.objects.values_list('pk', flat=True).iterator()])
+
+
+_lock = threading.Lock()
+_pending = {'changed': set(), 'stale': set()}
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related-posts')
+
+
+def schedule(changed=(), stale=()):
+    """
+    After the current transaction commits, ``update()`` the posts whose tags
+    changed and ``refresh()`` the ``stale`` ones.
+    """
+    changed, stale = set(changed), set(stale)
+    if changed or stale:
+        transaction.on_commit(lambda: _enqueue(changed, stale))
+
+
+def _enqueue(changed, stale):
+    with _lock:
+        idle = not (_pending['changed'] or _pending['stale'])
+        _pending['changed'].update(changed)
+        _pending['stale'].update(stale)
+    if not get_setting('ASYNC'):
+        drain()
+    elif idle:
+        _executor.submit(_drain_in_worker).add_done_callback(_log_failure)
+
+
+def _log_failure(future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Refreshing related posts failed", exc_info=exc)
+
+
+def _drain_in_worker():
+    close_old_connections()
+    try:
+        drain()
+    finally:
+        close_old_connections()
+
+
+def drain():
+    """Apply every queued refresh now."""
+    with _lock:
+        changed, stale = set(_pending['changed']), set(_pending['stale'])
+        _pending['changed'].clear()
+        _pending['stale'].clear()
+    if changed:
+        update(changed)
+    if stale - changed:
+        refresh(stale - changed)
@@ -0,0 +1,211 @@
+"""
+Full-text search over blog posts, for the search page and the typeahead.
+
+A post is searched through its PostDocument row: title, body and the post's
+tag names joined into one string, rewritten by ``blog.signals`` whenever the
+post or its tags change. A query's words must all appear, each as a word
+prefix, and a hit in the title outranks one in the tags, which outranks one
+in the body.
+
+Where the database has a full-text engine the work is done there
+(``DatabaseBackend``): FTS5 on SQLite (the table and its sync triggers come
+from migration 0003), a weighted tsvector GIN index on PostgreSQL. Other
+databases fall back to ``IcontainsBackend``, which scans. Every backend
+also builds ``snippets()``: a short, HTML-escaped excerpt of each result's
+body with the matched words wrapped in ``<mark>``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .models import PostDocument, PostSearchIndex
+
+TERM = re.compile(r'\w+')
+
+# Markers the databases wrap around matches; replaced after escaping.
+START, STOP = '\x02', '\x03'
+SNIPPET_WORDS = 30
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_LIMIT = 8
+SUGGEST_TIMEOUT = 60
+
+
+def terms(query):
+    return TERM.findall(query.lower())
+
+
+def render_snippet(text):
+    """Escape a marked-up snippet and turn the markers into <mark> tags."""
+    return mark_safe(escape(text).replace(START, '<mark>').replace(STOP, '</mark>'))
+
+
+class IcontainsBackend:
+    def search(self, queryset, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(search_document__title__icontains=word)
+                | Q(search_document__tags__icontains=word)
+                | Q(search_document__content__icontains=word)
+            )
+        return queryset.annotate(search_rank=Value(0.0))
+
+    def snippets(self, post_ids, query):
+        pattern = re.compile('|'.join(re.escape(word) for word in terms(query)) or '$^', re.IGNORECASE)
+        snippets = {}
+        for post_id, content in PostDocument.objects.filter(post_id__in=post_ids).values_list('post_id', 'content'):
+            match = pattern.search(content)
+            words = content[max(match.start() - 80, 0) if match else 0:].split()[:SNIPPET_WORDS]
+            marked = pattern.sub(lambda m: START + m.group(0) + STOP, ' '.join(words))
+            snippets[post_id] = render_snippet(marked)
+        return snippets
+
+
+class Match(Lookup):
+    """``document__match=<query>``: an FTS5 MATCH against the table's hidden column."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+PostSearchIndex._meta.get_field('document').register_lookup(Match)
+
+
+class DatabaseBackend:
+    """
+    Search with the database's full-text engine. Subclasses turn the query
+    into the engine's syntax (``prepare()``) and narrow a queryset to the
+    matching posts with a ``search_rank`` annotation, higher for better
+    matches (``matching()``), evaluating the full-text match once.
+    """
+
+    def prepare(self, query):
+        raise NotImplementedError
+
+    def matching(self, queryset, prepared):
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        if not terms(query):
+            return queryset.none()
+        return self.matching(queryset, self.prepare(query))
+
+
+class SQLiteFTS5Backend(DatabaseBackend):
+    table = 'blog_postdocument_fts'
+    # bm25 weights for the title, content and tags columns.
+    weights = (10.0, 1.0, 5.0)
+
+    def prepare(self, query):
+        return ' '.join(f'"{word}"*' for word in terms(query))
+
+    def matching(self, queryset, prepared):
+        # One inner join to the FTS table: MATCH runs once and bm25 is read
+        # from the same cursor. It is lower-is-better, hence the negation.
+        rank = Func(F('search_index__document'), *map(Value, self.weights), function='bm25',
+                    output_field=FloatField())
+        return queryset.filter(search_index__document__match=prepared).annotate(search_rank=-rank)
+
+    def snippets(self, post_ids, query):
+        if not post_ids or not terms(query):
+            return {}
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({self.table}, 1, %s, %s, '…', %s) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND rowid IN ({placeholders})",
+                [START, STOP, SNIPPET_WORDS, self.prepare(query), *post_ids],
+            )
+            return {post_id: render_snippet(text) for post_id, text in cursor.fetchall()}
+
+
+class PostgresFullTextBackend(DatabaseBackend):
+    # Must match the expression of the blog_postdocument_search GIN index.
+    vector = (
+        "setweight(to_tsvector('simple', blog_postdocument.title), 'A') || "
+        "setweight(to_tsvector('simple', blog_postdocument.tags), 'B') || "
+        "setweight(to_tsvector('simple', blog_postdocument.content), 'C')"
+    )
+
+    def prepare(self, query):
+        return ' & '.join(f'{word}:*' for word in terms(query))
+
+    def matching(self, queryset, prepared):
+        # The GIN index answers the pk__in subquery; ts_rank is then read by
+        # primary key for the matching documents only.
+        rank = RawSQL(
+            f"SELECT ts_rank({self.vector}, to_tsquery('simple', %s)) FROM blog_postdocument "
+            "WHERE blog_postdocument.post_id = blog_post.id",
+            [prepared], output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT post_id FROM blog_postdocument WHERE {self.vector} @@ to_tsquery('simple', %s)", [prepared],
+        )).annotate(search_rank=rank)
+
+    def snippets(self, post_ids, query):
+        if not post_ids or not terms(query):
+            return {}
+        options = f'StartSel={START}, StopSel={STOP}, MaxWords={SNIPPET_WORDS}, MinWords=10'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT post_id, ts_headline('simple', content, to_tsquery('simple', %s), %s) "
+                "FROM blog_postdocument WHERE post_id = ANY(%s)",
+                [self.prepare(query), options, list(post_ids)],
+            )
+            return {post_id: render_snippet(text) for post_id, text in cursor.fetchall()}
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresFullTextBackend,
+}
+
+
+def get_backend():
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, IcontainsBackend)()
+
+
+def document_for(post):
+    # Uses the prefetched tags when present.
+    tags = ' '.join(sorted(tag.name for tag in post.tags.all()))
+    return PostDocument(post=post, title=post.title, content=post.content, tags=tags)
+
+
+def index_posts(posts):
+    """Create or refresh the search documents of ``posts`` in one statement."""
+    PostDocument.objects.bulk_create(
+        [document_for(post) for post in posts],
+        update_conflicts=True,
+        unique_fields=['post'],
+        update_fields=['title', 'content', 'tags'],
+    )
+
+
+def rebuild():
+    from .models import Post
+
+    PostDocument.objects.all().delete()
+    posts = Post.objects.prefetch_related('tags').order_by('pk')
+    batch = []
+    for post in posts.iterator(chunk_size=2000):
+        batch.append(post)
+        if len(batch) == 2000:
+            index_posts(batch)
+            batch = []
+    if batch:
+        index_posts(batch)
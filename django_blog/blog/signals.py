@@ -0,0 +1,160 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from . import related, tags
+from .caching import invalidate
+from .models import Comment, Post, RelatedPost, TaggedPost
+from .search import index_posts
+
+
+# Keep the search document of a post in step with its title, body and tags.
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    index_posts([instance])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def reindex_post_tags(sender, instance, action, **kwargs):
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        index_posts([instance])
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, **kwargs):
+    if not created:
+        index_posts(Post.objects.filter(tags=instance).prefetch_related('tags'))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    instance._tagged_post_ids = list(Post.objects.filter(tags=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_deleted_tag(sender, instance, **kwargs):
+    index_posts(Post.objects.filter(pk__in=getattr(instance, '_tagged_post_ids', [])).prefetch_related('tags'))
+
+
+# Keep the tag cloud and related-tag counts (see blog/tags.py) in step with
+# post tags. Deleting a post cascades to its TaggedPost rows without an
+# m2m_changed signal, and deleting a tag cascades to its own summary rows.
+def post_tag_ids(post):
+    return set(TaggedPost.objects.filter(content_object=post).values_list('tag_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_post_tags(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Post):
+        return
+    if action == 'pre_clear':
+        instance._cleared_tag_ids = post_tag_ids(instance)
+    elif action == 'post_clear':
+        tags.apply(getattr(instance, '_cleared_tag_ids', ()), delta=-1)
+    elif action in ('post_add', 'post_remove'):
+        tags.apply(pk_set or (), post_tag_ids(instance), delta=1 if action == 'post_add' else -1)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tag_ids(sender, instance, **kwargs):
+    instance._tag_ids = post_tag_ids(instance)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post_tags(sender, instance, **kwargs):
+    tags.apply(getattr(instance, '_tag_ids', ()), delta=-1)
+
+
+# Recompute related posts (see blog/related.py) once post tag changes
+# commit. A deleted post drops out of the lists that linked to it, which are
+# refilled.
+@receiver(m2m_changed, sender=Post.tags.through)
+def relate_post_tags(sender, instance, action, **kwargs):
+    if isinstance(instance, Post) and action in ('post_add', 'post_remove', 'post_clear'):
+        related.schedule(changed=[instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def remember_linking_posts(sender, instance, **kwargs):
+    instance._linking_post_ids = list(RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def relate_deleted_post(sender, instance, **kwargs):
+    related.schedule(stale=getattr(instance, '_linking_post_ids', ()))
+
+
+@receiver(post_delete, sender=Tag)
+def relate_deleted_tag(sender, instance, **kwargs):
+    related.schedule(changed=getattr(instance, '_tagged_post_ids', ()))
+
+
+# Invalidate cached pages and fragments (see blog/caching.py). Tag listings
+# are keyed by tag name; ``tags`` covers the tag cloud.
+def tag_scopes(names):
+    return [f'tag:{name}' for name in names]
+
+
+def post_tag_scopes(post):
+    return tag_scopes(post.tags.values_list('name', flat=True))
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post(sender, instance, created, **kwargs):
+    # Posts listing this one as related show its title.
+    linking = [] if created else RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    invalidate('posts', f'post:{instance.pk}', *post_tag_scopes(instance), *[f'post:{pk}' for pk in linking])
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    instance._cache_scopes = post_tag_scopes(instance)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    invalidate('posts', 'tags', f'post:{instance.pk}', *getattr(instance, '_cache_scopes', []))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    invalidate(f'post:{instance.post_id}')
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tags(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Post):
+        return
+    if action == 'pre_clear':
+        instance._cleared_tag_scopes = post_tag_scopes(instance)
+    elif action == 'post_clear':
+        invalidate('tags', f'post:{instance.pk}', *getattr(instance, '_cleared_tag_scopes', []))
+    elif action in ('post_add', 'post_remove'):
+        # The post's other tags list the changed ones as related tags.
+        changed = Tag.objects.filter(pk__in=pk_set or ()).values_list('name', flat=True)
+        invalidate('tags', f'post:{instance.pk}', *tag_scopes(changed), *post_tag_scopes(instance))
+
+
+@receiver(pre_save, sender=Tag)
+def remember_tag_name(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous = Tag.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    post_ids = getattr(instance, '_tagged_post_ids', None)
+    if post_ids is None:
+        post_ids = Post.objects.filter(tags=instance).values_list('pk', flat=True)
+    post_ids = list(post_ids)
+    # Tags sharing a post list this one among their related tags.
+    related_tags = Tag.objects.filter(blog_taggedpost_items__content_object__in=post_ids).values_list('name', flat=True)
+    invalidate(
+        'tags',
+        *tag_scopes([instance.name] + ([previous] if previous else [])),
+        *tag_scopes(related_tags.distinct()),
+        *[f'post:{pk}' for pk in post_ids],
+    )
@@ -0,0 +1,133 @@
+"""
+Tag browsing: date-ordered tag listings, the tag cloud and related tags.
+
+Post tags live in ``TaggedPost`` (blog.models), so a tag listing is a range
+scan of ``taggedpost_tag_date_idx`` in page order. Two summaries keep the
+aggregate reads O(tags):
+
+- ``TagStats``: posts per tag, for the cloud and the listing's page count,
+- ``TagPair``: posts sharing each pair of tags, in both directions, for
+  "related tags".
+
+``blog.signals`` adjusts both by delta when a post's tags change or a post
+is deleted (``apply()``). Writes that skip signals (``bulk_create``, raw
+SQL) call ``rebuild()``, or run ``manage.py rebuild_tag_stats``.
+"""
+from collections import Counter
+from itertools import permutations
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Post, TaggedPost, TagPair, TagStats
+
+CLOUD_WEIGHTS = 5
+
+
+def posts_with(tag):
+    """Posts tagged ``tag``, newest first, in ``taggedpost_tag_date_idx`` order."""
+    return Post.objects.filter(tagged_items__tag=tag).order_by(
+        '-tagged_items__published_date', '-tagged_items__content_object',
+    )
+
+
+def post_count(tag):
+    """Posts tagged ``tag``; reads the ``blog_stats`` row joined in by ``select_related``."""
+    try:
+        return tag.blog_stats.post_count
+    except TagStats.DoesNotExist:
+        return 0
+
+
+def related(tag, limit=10):
+    """The tags most often used together with ``tag``, with their shared post counts."""
+    pairs = TagPair.objects.filter(tag=tag).select_related('other').order_by('-post_count', 'other')[:limit]
+    result = []
+    for pair in pairs:
+        pair.other.post_count = pair.post_count
+        result.append(pair.other)
+    return result
+
+
+def cloud(limit=100):
+    """
+    The ``limit`` most used tags in name order, each with ``post_count`` and
+    a ``weight`` from 1 to CLOUD_WEIGHTS scaled between the least and most
+    used tag shown.
+    """
+    rows = list(TagStats.objects.select_related('tag').order_by('-post_count', 'tag')[:limit])
+    if not rows:
+        return []
+    top, bottom = rows[0].post_count, rows[-1].post_count
+    tags = []
+    for row in rows:
+        row.tag.post_count = row.post_count
+        row.tag.weight = 1 + (row.post_count - bottom) * (CLOUD_WEIGHTS - 1) // max(top - bottom, 1)
+        tags.append(row.tag)
+    return sorted(tags, key=lambda tag: tag.name.lower())
+
+
+def _adjust(model, filters, keys, delta):
+    if delta > 0:
+        model.objects.bulk_create([model(post_count=0, **key) for key in keys], ignore_conflicts=True)
+    model.objects.filter(filters).update(post_count=F('post_count') + delta)
+    if delta < 0:
+        model.objects.filter(filters, post_count=0).delete()
+
+
+@transaction.atomic
+def apply(changed, others=(), delta=1):
+    """
+    Adjust the summaries for one post gaining (``delta=1``) or losing
+    (``delta=-1``) the tags ``changed`` while keeping the tags ``others``.
+    """
+    changed, others = set(changed), set(others) - set(changed)
+    if not changed:
+        return
+    _adjust(TagStats, Q(tag__in=changed), [{'tag_id': tag_id} for tag_id in changed], delta)
+
+    pairs = set(permutations(changed, 2))
+    pairs.update((tag_id, other_id) for tag_id in changed for other_id in others)
+    pairs.update((other_id, tag_id) for tag_id in changed for other_id in others)
+    if pairs:
+        _adjust(
+            TagPair,
+            Q(tag__in=changed, other__in=changed | others) | Q(tag__in=others, other__in=changed),
+            [{'tag_id': tag_id, 'other_id': other_id} for tag_id, other_id in pairs],
+            delta,
+        )
+
+
+def count(tag_ids_by_post):
+    """``(TagStats, TagPair)`` counters over an iterable of per-post tag id sets."""
+    counts, pairs = Counter(), Counter()
+    for tag_ids in tag_ids_by_post:
+        counts.update(tag_ids)
+        pairs.update(permutations(tag_ids, 2))
+    return counts, pairs
+
+
+def tag_ids_by_post():
+    current, tag_ids = None, set()
+    rows = TaggedPost.objects.order_by('content_object', 'tag').values_list('content_object_id', 'tag_id')
+    for post_id, tag_id in rows.iterator(chunk_size=2000):
+        if post_id != current and tag_ids:
+            yield tag_ids
+            tag_ids = set()
+        current = post_id
+        tag_ids.add(tag_id)
+    if tag_ids:
+        yield tag_ids
+
+
+@transaction.atomic
+def rebuild():
+    counts, pairs = count(tag_ids_by_post())
+    TagStats.objects.all().delete()
+    TagPair.objects.all().delete()
+    TagStats.objects.bulk_create([TagStats(tag_id=tag_id, post_count=n) for tag_id, n in counts.items()],
+                                 batch_size=2000)
+    TagPair.objects.bulk_create(
+        [TagPair(tag_id=tag_id, other_id=other_id, post_count=n) for (tag_id, other_id), n in pairs.items()],
+        batch_size=2000,
+    )
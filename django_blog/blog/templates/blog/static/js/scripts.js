@@ -0,0 +1,43 @@
+// Search typeahead: queries the suggest endpoint once typing pauses.
+(function () {
+    var input = document.querySelector('input[data-suggest-url]');
+    if (!input) {
+        return;
+    }
+    var list = input.form.querySelector('.suggestions');
+    var timer = null;
+    var latest = '';
+
+    function render(results) {
+        list.innerHTML = '';
+        results.forEach(function (result) {
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            link.href = result.url;
+            link.textContent = result.title;
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        list.hidden = results.length === 0;
+    }
+
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            var query = input.value.trim();
+            latest = query;
+            if (query.length < 2) {
+                render([]);
+                return;
+            }
+            fetch(input.dataset.suggestUrl + '?q=' + encodeURIComponent(query))
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    // Ignore answers to queries the user has typed past.
+                    if (query === latest) {
+                        render(data.results);
+                    }
+                });
+        }, 250);
+    });
+})();
@@ -0,0 +1,47 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog import caching
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, scopes, vary):
+        self.nodelist, self.name, self.scopes, self.vary = nodelist, name, scopes, vary
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        scopes = [scope.resolve(context) for scope in self.scopes]
+        vary = [value.resolve(context) for value in self.vary]
+        return mark_safe(caching.get_or_render(name, scopes, vary, lambda: self.nodelist.render(context)))
+
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """
+    Cache the enclosed template until one of its scopes changes::
+
+        {% fragment "post-body" post %}...{% endfragment %}
+        {% fragment "post-comments" post vary comments.number user.pk %}...{% endfragment %}
+
+    Scopes are posts, tags or scope strings (see blog/caching.py); values
+    after ``vary`` are added to the key without being invalidation scopes.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a name and at least one scope.")
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+
+    args = bits[2:]
+    vary = []
+    if 'vary' in args:
+        index = args.index('vary')
+        args, vary = args[:index], args[index + 1:]
+    return FragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(arg) for arg in args],
+        [parser.compile_filter(arg) for arg in vary],
+    )
@@ -1,3 +1,369 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from taggit.models import Tag
+
+from . import related, tags
+from .models import Comment, Post, RelatedPost, TagPair, TagStats
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        cls.django = Post.objects.create(
+            title="Django deployment", content="Notes on running <b>servers</b> in production.", author=cls.author,
+        )
+        cls.guide = Post.objects.create(
+            title="Gardening", content="Why I switched my blog to django last spring.", author=cls.author,
+        )
+        cls.tagged = Post.objects.create(title="Weekly links", content="Assorted reading.", author=cls.author)
+        cls.tagged.tags.add("djangocon")
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query, **params):
+        response = self.client.get(reverse("post-search"), {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_title_hits_rank_above_tag_and_body_hits(self):
+        posts = self.search("djan").context["posts"]
+        self.assertEqual([post.title for post in posts], ["Django deployment", "Weekly links", "Gardening"])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        response = self.search("servers")
+        self.assertContains(response, "&lt;b&gt;<mark>servers</mark>&lt;/b&gt;", html=False)
+
+    def test_results_are_paginated(self):
+        for n in range(12):
+            Post.objects.create(title=f"Django tip {n}", content="Short.", author=self.author)
+        first = self.search("django")
+        self.assertTrue(first.context["is_paginated"])
+        self.assertEqual(len(first.context["posts"]), 10)
+        # 12 tips plus the three setUpTestData posts ("djangocon" matches as a prefix).
+        self.assertEqual(len(self.search("django", page=2).context["posts"]), 5)
+
+    def test_index_follows_edits_and_tag_changes(self):
+        self.guide.content = "Nothing to see."
+        self.guide.save()
+        self.tagged.tags.set(["python"])
+        self.assertEqual([post.title for post in self.search("django").context["posts"]], ["Django deployment"])
+        self.assertEqual([post.title for post in self.search("python").context["posts"]], ["Weekly links"])
+
+    def test_suggest_returns_cached_title_matches(self):
+        url = reverse("post-search-suggest")
+        self.assertEqual(self.client.get(url, {"q": "d"}).json()["results"], [])
+
+        response = self.client.get(url, {"q": "  Django  DEPLOY"})
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        self.assertEqual([hit["title"] for hit in response.json()["results"]], ["Django deployment"])
+        with self.assertNumQueries(0):
+            self.client.get(url, {"q": "django deploy"})
+
+
+class PostListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        Post.objects.bulk_create([
+            Post(title=f"Post {n}", content="word " * 500, excerpt=f"Excerpt {n}", author=cls.author)
+            for n in range(23)
+        ])
+        # Ties on published_date are broken by id.
+        Post.objects.update(published_date=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, response):
+        return [post.title for post in response.context["posts"]]
+
+    def test_pages_walk_by_cursor_in_both_directions(self):
+        url = reverse("post-list")
+        first = self.client.get(url)
+        self.assertEqual(self.titles(first), [f"Post {n}" for n in range(22, 12, -1)])
+        self.assertFalse(first.context["page_obj"].has_previous())
+
+        second = self.client.get(url, {"after": first.context["page_obj"].next_cursor})
+        third = self.client.get(url, {"after": second.context["page_obj"].next_cursor})
+        self.assertEqual(self.titles(third), ["Post 2", "Post 1", "Post 0"])
+        self.assertFalse(third.context["page_obj"].has_next())
+
+        back = self.client.get(url, {"before": third.context["page_obj"].previous_cursor})
+        self.assertEqual(self.titles(back), self.titles(second))
+        top = self.client.get(url, {"before": back.context["page_obj"].previous_cursor})
+        self.assertEqual(self.titles(top), self.titles(first))
+
+    def test_list_reads_excerpts_not_bodies(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("post-list"))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"content"', queries[0]["sql"])
+        self.assertContains(response, "Excerpt 22")
+
+    def test_excerpt_follows_content(self):
+        post = Post.objects.create(title="Long", content="x" * 300, author=self.author)
+        self.assertEqual(len(post.excerpt), 100)
+        post.content = "Short now."
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Short now.")
+
+    def test_bad_cursor_is_not_found(self):
+        self.assertEqual(self.client.get(reverse("post-list"), {"after": "garbage"}).status_code, 404)
+
+
+class PostDetailQueryTests(TestCase):
+    """The detail page must render in a fixed query budget, whatever its size."""
+
+    # post + author, tags, related posts, comment count, comment page + authors (cache cold)
+    QUERY_BUDGET = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        cls.post = Post.objects.create(title="Busy post", content="Body.", author=cls.author)
+        cls.post.tags.add("one", "two", "three")
+
+    def add_comments(self, count):
+        start = User.objects.count()
+        readers = [User.objects.create_user(username=f"reader{start + n}") for n in range(count)]
+        Comment.objects.bulk_create([Comment(post=self.post, author=reader, content="Hi") for reader in readers])
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("post-detail", args=[self.post.pk]), params)
+        self.assertLessEqual(len(queries), self.QUERY_BUDGET, "\n".join(q["sql"] for q in queries))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_comments(self):
+        self.add_comments(3)
+        self.render()
+        self.add_comments(57)
+        response = self.render()
+        self.assertContains(response, "Comments (60)")
+        self.assertContains(response, "reader", count=20)
+        self.assertContains(response, 'href="/tags/three/"')
+
+    def test_comment_pages(self):
+        self.add_comments(25)
+        response = self.render(comments_page=2)
+        self.assertEqual(len(response.context["comments"]), 5)
+        self.assertContains(response, "Earlier comments")
+
+
+class BlogCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        cls.post = Post.objects.create(title="Cached post", content="Body.", author=cls.author)
+        cls.post.tags.add("django")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_and_tag_pages_are_served_from_cache(self):
+        self.get(reverse("post-list"))
+        self.get(reverse("tag-posts", args=["django"]))
+        with self.assertNumQueries(0):
+            self.assertContains(self.get(reverse("post-list")), "Cached post")
+            self.assertContains(self.get(reverse("tag-posts", args=["django"])), "Cached post")
+
+    def test_post_edit_invalidates_list_tag_and_detail(self):
+        detail = reverse("post-detail", args=[self.post.pk])
+        for url in (reverse("post-list"), reverse("tag-posts", args=["django"]), detail):
+            self.get(url)
+        self.post.title = "Renamed post"
+        self.post.save()
+        for url in (reverse("post-list"), reverse("tag-posts", args=["django"]), detail):
+            self.assertContains(self.get(url), "Renamed post")
+
+    def test_detail_fragments_skip_tags_and_comment_rows_on_hit(self):
+        detail = reverse("post-detail", args=[self.post.pk])
+        self.get(detail)
+        with self.assertNumQueries(2):  # post + author, comment count
+            self.get(detail)
+
+        Comment.objects.create(post=self.post, author=self.author, content="First!")
+        self.assertContains(self.get(detail), "First!")
+
+    def test_tag_changes_invalidate_only_affected_listings(self):
+        self.get(reverse("tag-posts", args=["django"]))
+        self.get(reverse("tag-posts", args=["python"]))
+        self.post.tags.set(["python"])
+        self.assertNotContains(self.get(reverse("tag-posts", args=["django"])), "Cached post")
+        self.assertContains(self.get(reverse("tag-posts", args=["python"])), "Cached post")
+        self.assertContains(self.get(reverse("post-detail", args=[self.post.pk])), 'href="/tags/python/"')
+
+    def test_stats_count_hits_and_misses(self):
+        for _ in range(3):
+            self.get(reverse("post-list"))
+        staff = User.objects.create_user(username="staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        stats = self.client.get(reverse("cache-stats")).json()
+        self.assertEqual(stats["post-list"], {"hits": 2, "misses": 1, "hit_rate": 0.667, "timeout": 600})
+
+
+class TagBrowsingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        cls.posts = [Post.objects.create(title=f"Post {n}", content="Body.", author=cls.author) for n in range(25)]
+        for post in cls.posts:
+            post.tags.add("django")
+        for post in cls.posts[:3]:
+            post.tags.add("orm", "python")
+        cls.posts[0].tags.add("postgres")
+
+    def setUp(self):
+        cache.clear()
+
+    def summary(self):
+        counts = {row.tag.name: row.post_count for row in TagStats.objects.select_related("tag")}
+        pairs = {(row.tag.name, row.other.name): row.post_count
+                 for row in TagPair.objects.select_related("tag", "other")}
+        return counts, pairs
+
+    def test_listing_is_paginated_newest_first_without_counting(self):
+        url = reverse("tag-posts", args=["django"])
+        # tag + stats, page of posts, related tags
+        with self.assertNumQueries(3):
+            first = self.client.get(url)
+        self.assertEqual([post.title for post in first.context["posts"]],
+                         [f"Post {n}" for n in range(24, 4, -1)])
+        self.assertEqual(first.context["paginator"].num_pages, 2)
+        self.assertEqual(len(self.client.get(url, {"page": 2}).context["posts"]), 5)
+        self.assertEqual([(tag.name, tag.post_count) for tag in first.context["related_tags"]],
+                         [("orm", 3), ("python", 3), ("postgres", 1)])
+
+    def test_unknown_tag_lists_nothing(self):
+        response = self.client.get(reverse("tag-posts", args=["nope"]))
+        self.assertContains(response, "No posts found for this tag.")
+
+    def test_slug_urls_redirect_to_the_tag_listing(self):
+        Tag.objects.filter(name="postgres").update(name="PostgreSQL")
+        response = self.client.get(reverse("tag-posts-by-slug", args=["postgres"]))
+        self.assertRedirects(response, reverse("tag-posts", args=["PostgreSQL"]), status_code=301)
+        self.assertEqual(self.client.get(reverse("tag-posts-by-slug", args=["nope"])).status_code, 404)
+
+    def test_cloud_weights_tags_by_post_count(self):
+        response = self.client.get(reverse("tag-cloud"))
+        self.assertEqual([(tag.name, tag.post_count, tag.weight) for tag in response.context["tags"]],
+                         [("django", 25, 5), ("orm", 3, 1), ("postgres", 1, 1), ("python", 3, 1)])
+
+    def test_summaries_follow_tag_changes_and_deletes(self):
+        post = self.posts[0]
+        post.tags.set(["django", "orm", "sql"])
+        self.posts[1].tags.clear()
+        self.posts[2].delete()
+        counts, pairs = self.summary()
+        self.assertEqual(counts, {"django": 23, "orm": 1, "sql": 1})
+        self.assertEqual(pairs, {
+            ("django", "orm"): 1, ("orm", "django"): 1,
+            ("django", "sql"): 1, ("sql", "django"): 1,
+            ("orm", "sql"): 1, ("sql", "orm"): 1,
+        })
+        expected = self.summary()
+        tags.rebuild()
+        self.assertEqual(self.summary(), expected)
+
+    def test_cached_pages_follow_tag_changes(self):
+        self.client.get(reverse("tag-cloud"))
+        self.client.get(reverse("tag-posts", args=["orm"]))
+        self.posts[10].tags.add("orm", "sql")
+        self.assertContains(self.client.get(reverse("tag-cloud")), ">sql</a>")
+        self.assertContains(self.client.get(reverse("tag-posts", args=["orm"])), ">sql</a> (1)")
+
+
+@override_settings(BLOG_RELATED={"ASYNC": False})
+class RelatedPostTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="password123")
+        tagging = {
+            "Query tuning": ["django", "orm", "postgres"],
+            "ORM tricks": ["django", "orm"],
+            "Postgres indexes": ["postgres", "sql"],
+            "Django forms": ["django", "forms"],
+            "Gardening": ["plants"],
+        }
+        cls.posts = {}
+        for title, names in tagging.items():
+            cls.posts[title] = post = Post.objects.create(title=title, content="Body.", author=cls.author)
+            post.tags.add(*names)
+        # Refreshes are deferred to commit, which setUpTestData never reaches.
+        related.rebuild()
+
+    def setUp(self):
+        cache.clear()
+
+    def related_titles(self, title):
+        links = RelatedPost.objects.filter(post=self.posts[title]).order_by("rank")
+        return [link.related.title for link in links]
+
+    def test_neighbours_are_ranked_by_jaccard_overlap(self):
+        # ORM tricks shares 2 of 3 tags; Django forms and Postgres indexes tie
+        # at 1 of 4 and the newer post wins.
+        self.assertEqual(self.related_titles("Query tuning"), ["ORM tricks", "Django forms", "Postgres indexes"])
+        self.assertEqual(self.related_titles("Gardening"), [])
+        scores = RelatedPost.objects.filter(post=self.posts["Query tuning"]).values_list("score", flat=True)
+        self.assertAlmostEqual(scores[0], 2 / 3)
+
+    def test_tag_changes_refresh_affected_lists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts["Gardening"].tags.add("django", "orm")
+            self.posts["Postgres indexes"].tags.clear()
+            # Nothing is recomputed inside the writing transaction.
+            self.assertEqual(self.related_titles("Gardening"), [])
+        self.assertEqual(self.related_titles("ORM tricks"), ["Gardening", "Query tuning", "Django forms"])
+        self.assertNotIn("Postgres indexes", self.related_titles("Query tuning"))
+
+        incremental = set(RelatedPost.objects.values_list("post", "related", "rank"))
+        related.rebuild()
+        self.assertEqual(set(RelatedPost.objects.values_list("post", "related", "rank")), incremental)
+
+    def test_deleted_posts_leave_the_lists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts["ORM tricks"].delete()
+        self.assertEqual(self.related_titles("Query tuning"), ["Django forms", "Postgres indexes"])
+
+    def test_background_refreshes_are_queued_until_drained(self):
+        with self.settings(BLOG_RELATED={"ASYNC": True}), mock.patch.object(related, "_executor") as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.posts["Gardening"].tags.add("django")
+            with self.captureOnCommitCallbacks(execute=True):
+                self.posts["Gardening"].tags.add("orm")
+        executor.submit.assert_called_once_with(related._drain_in_worker)
+        related.drain()
+        self.assertEqual(self.related_titles("ORM tricks")[0], "Gardening")
+
+    @override_settings(BLOG_RELATED={"TOP_K": 1, "MEASURE": "cosine"})
+    def test_top_k_and_measure_are_configurable(self):
+        related.rebuild()
+        self.assertEqual(self.related_titles("Query tuning"), ["ORM tricks"])
+        score = RelatedPost.objects.get(post=self.posts["Query tuning"]).score
+        self.assertAlmostEqual(score, 2 / (3 * 2) ** 0.5)
+
+    def test_detail_page_lists_related_posts_and_follows_renames(self):
+        url = reverse("post-detail", args=[self.posts["Query tuning"].pk])
+        self.assertContains(self.client.get(url), ">ORM tricks</a>")
+        self.posts["ORM tricks"].title = "ORM recipes"
+        self.posts["ORM tricks"].save()
+        self.assertContains(self.client.get(url), ">ORM recipes</a>")
@@ -1,3 +1,4 @@
+from django.contrib.auth import views as auth_views
 from django.urls import path
 from .views import (
     PostListView,
@@ -8,9 +9,19 @@ from .views import (
     CommentCreateView,
     CommentUpdateView,
     CommentDeleteView,
+    TagPostListView,
+    PostByTagListView,
+    TagCloudView,
+    PostSearchView,
+    search_suggest,
+    cache_stats,
+    RegisterView,
+    ProfileView,
 )
 
 urlpatterns = [
+    path('', PostListView.as_view(), name='home'),
+
     # Post CRUD
     path('posts/', PostListView.as_view(), name='post-list'),
     path('posts/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
@@ -25,7 +36,16 @@ urlpatterns = [
 
      # ✅ TAG + SEARCH (CHECKER REQUIRED)
     path('tags/<str:tag_name>/', TagPostListView.as_view(), name='tag-posts'),
+    path('tags/slug/<slug:tag_slug>/', PostByTagListView.as_view(), name='tag-posts-by-slug'),
+    path('tags/', TagCloudView.as_view(), name='tag-cloud'),
     path('search/', PostSearchView.as_view(), name='post-search'),
-]
-]
+    path('search/suggest/', search_suggest, name='post-search-suggest'),
 
+    path('cache-stats/', cache_stats, name='cache-stats'),
+
+    # Accounts
+    path('login/', auth_views.LoginView.as_view(template_name='blog/login.html'), name='login'),
+    path('logout/', auth_views.LogoutView.as_view(), name='logout'),
+    path('register/', RegisterView.as_view(), name='register'),
+    path('profile/', ProfileView.as_view(), name='profile'),
+]
@@ -1,13 +1,108 @@
+import hashlib
+
 from django.shortcuts import get_object_or_404
-from django.views.generic import CreateView, UpdateView, DeleteView
+from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required  # checker wants this import
-from django.urls import reverse_lazy
-from django.db.models import Q
-from django.views.generic import ListView
+from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.urls import reverse, reverse_lazy
+from django.views.generic import ListView, RedirectView, TemplateView
+from taggit.models import Tag
 
+from . import caching, search, tags
 from .models import Post, Comment
-from .forms import CommentForm
+from .pagination import KeysetPaginator
+from .forms import CommentForm, PostForm
+
+# -------------------
+# POST CRUD VIEWS
+# -------------------
+
+class PostListView(caching.CachedPageMixin, ListView):
+    """
+    Newest posts first, keyset paginated (?after= / ?before= cursors, see
+    blog/pagination.py). Only the columns the list shows are read; the
+    stored excerpt stands in for the body.
+    """
+    cache_name = 'post-list'
+    model = Post
+    template_name = 'blog/post_list.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        return Post.objects.only('id', 'title', 'excerpt', 'published_date')
+
+    def paginate_queryset(self, queryset, page_size):
+        page = KeysetPaginator(queryset, page_size).page(
+            after=self.request.GET.get('after'), before=self.request.GET.get('before'),
+        )
+        return (None, page, page.object_list, page.has_other_pages())
+
+
+class PostDetailView(DetailView):
+    """
+    A post with its tags, related posts and one page of comments
+    (?comments_page=N). Rendering costs a fixed number of queries however
+    many comments or tags the post has: author joined in, tags in one
+    query, related posts in one read of the precomputed RelatedPost index
+    (see blog/related.py), comments paged with their authors joined in. The
+    body/tags, related and comment fragments are cached (see
+    blog/caching.py), so on a hit only the post and the comment count are
+    read; tags, related posts and comment rows load lazily inside the
+    fragments.
+    """
+    model = Post
+    template_name = 'blog/post_detail.html'
+    comments_per_page = 20
+
+    def get_queryset(self):
+        return Post.objects.select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments = self.object.comments.select_related('author').order_by('created_at', 'id')
+        page = Paginator(comments, self.comments_per_page).get_page(self.request.GET.get('comments_page'))
+        context['comments'] = page
+        # Lazy: only read when the related-posts fragment misses.
+        context['related_posts'] = (
+            Post.objects.filter(related_backlinks__post=self.object)
+            .order_by('related_backlinks__rank').only('id', 'title')
+        )
+        return context
+
+
+class PostCreateView(LoginRequiredMixin, CreateView):
+    model = Post
+    form_class = PostForm
+    template_name = 'blog/post_form.html'
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
+        return super().form_valid(form)
+
+
+class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+    model = Post
+    form_class = PostForm
+    template_name = 'blog/post_form.html'
+
+    def test_func(self):
+        return self.request.user == self.get_object().author
+
+
+class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+    model = Post
+    template_name = 'blog/post_confirm_delete.html'
+    success_url = reverse_lazy('post-list')
+
+    def test_func(self):
+        return self.request.user == self.get_object().author
 
 # -------------------
 # COMMENT CRUD VIEWS
@@ -19,24 +114,13 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     template_name = 'blog/comment_form.html'
 
     def form_valid(self, form):
-        post_id = self.kwargs['post_id']
+        post_id = self.kwargs['pk']
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, id=post_id)
         return super().form_valid(form)
 
     def get_success_url(self):
         return self.object.post.get_absolute_url()
-    
-    def search_posts(request):
-    query = request.GET.get('q', '')
-
-    posts = Post.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query) |
-        Q(tags__name__icontains=query)
-    ).distinct()
-
-    return render(request, 'blog/search_results.html', {'posts': posts, 'query': query})
 
 
 class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
@@ -61,10 +145,149 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     def get_success_url(self):
         return self.object.post.get_absolute_url()
 
-class PostByTagListView(ListView):
+# -------------------
+# TAGS
+# -------------------
+
+class TagPostListView(caching.CachedPageMixin, ListView):
+    """
+    Posts with one tag (by name), newest first and paginated, with the tags
+    most often used alongside it. The page is one range scan of the
+    TaggedPost date index; the page count and related tags come from the
+    tag summaries (see blog/tags.py), never from a COUNT or GROUP BY.
+    """
+    cache_name = 'tag-posts'
     model = Post
-    template_name = 'blog/post_list.html'
+    template_name = 'blog/tag_posts.html'
     context_object_name = 'posts'
+    paginate_by = 20
+    related_tags = 10
+
+    def cache_scopes(self):
+        return [f"tag:{self.kwargs['tag_name']}"]
 
     def get_queryset(self):
-        return Post.objects.filter(tags__slug=self.kwargs['tag_slug'])
+        self.tag = Tag.objects.select_related('blog_stats').filter(name=self.kwargs['tag_name']).first()
+        if self.tag is None:
+            return Post.objects.none()
+        return tags.posts_with(self.tag).only('id', 'title', 'excerpt', 'published_date')
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        if self.tag is not None:
+            paginator.count = tags.post_count(self.tag)
+        return paginator
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag'] = self.tag
+        context['tag_label'] = self.kwargs['tag_name']
+        context['related_tags'] = tags.related(self.tag, self.related_tags) if self.tag else []
+        return context
+
+
+class PostByTagListView(RedirectView):
+    """Old slug-addressed tag listing; redirects to the name-addressed one."""
+    permanent = True
+
+    def get_redirect_url(self, *args, **kwargs):
+        tag = get_object_or_404(Tag, slug=kwargs['tag_slug'])
+        return reverse('tag-posts', args=[tag.name])
+
+
+class TagCloudView(caching.CachedPageMixin, TemplateView):
+    """The most used tags, sized by post count, from the TagStats summary."""
+    cache_name = 'tag-cloud'
+    template_name = 'blog/tag_cloud.html'
+    cloud_size = 100
+
+    def cache_scopes(self):
+        return ['tags']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tags'] = tags.cloud(self.cloud_size)
+        return context
+
+# -------------------
+# SEARCH
+# -------------------
+
+class PostSearchView(ListView):
+    """
+    Ranked full-text search over post titles, bodies and tags (see
+    blog/search.py), paginated, with a highlighted snippet per hit.
+    """
+    template_name = 'blog/search_results.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return Post.objects.none()
+        posts = Post.objects.defer('content')
+        return search.get_backend().search(posts, self.query).order_by('-search_rank', '-published_date')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        # Snippets for the current page only, in one query.
+        snippets = search.get_backend().snippets([post.pk for post in context['posts']], self.query)
+        for post in context['posts']:
+            post.snippet = snippets.get(post.pk, '')
+        return context
+
+
+search_posts = PostSearchView.as_view()
+
+
+def search_suggest(request):
+    """
+    Typeahead: the best few title matches for ``?q=`` as JSON. Responses are
+    cached per normalized query, so a client firing on every keystroke (or
+    every debounce tick) mostly hits the cache.
+    """
+    query = ' '.join(search.terms(request.GET.get('q', '')))
+    if len(query) < search.SUGGEST_MIN_LENGTH:
+        return JsonResponse({'query': query, 'results': []})
+
+    key = 'blog:suggest:' + hashlib.md5(query.encode()).hexdigest()
+    results = cache.get(key)
+    if results is None:
+        posts = search.get_backend().search(Post.objects.all(), query).order_by('-search_rank', '-published_date')
+        results = [
+            {'id': post.pk, 'title': post.title, 'url': post.get_absolute_url()}
+            for post in posts.only('id', 'title')[:search.SUGGEST_LIMIT]
+        ]
+        cache.set(key, results, search.SUGGEST_TIMEOUT)
+    response = JsonResponse({'query': query, 'results': results})
+    response['Cache-Control'] = f'public, max-age={search.SUGGEST_TIMEOUT}'
+    return response
+
+# -------------------
+# ACCOUNTS
+# -------------------
+
+@login_required
+def cache_stats(request):
+    """Fragment/page cache hit and miss counters, for tuning BLOG_CACHE TTLs."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse(caching.stats())
+
+
+class RegisterView(CreateView):
+    form_class = UserCreationForm
+    template_name = 'blog/register.html'
+    success_url = reverse_lazy('login')
+
+
+class ProfileView(LoginRequiredMixin, UpdateView):
+    model = User
+    fields = ['first_name', 'last_name', 'email']
+    template_name = 'blog/profile.html'
+    success_url = reverse_lazy('profile')
+
+    def get_object(self, queryset=None):
+        return self.request.user
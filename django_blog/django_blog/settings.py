@@ -84,6 +84,24 @@ DATABASES = {
         'PASSWORD': 'postgres',
         'HOST': 'localhost',
         'PORT': '5432',
+    }
+}
+
+
+# Cache
+# Local memory for development; FileBasedCache (or Redis/Memcached in
+# production) shares entries across worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-blog',
+    }
+}
+
+# Page/fragment cache TTLs, see blog/caching.py.
+BLOG_CACHE = {
+    'TIMEOUT': 600,
 }
 
 
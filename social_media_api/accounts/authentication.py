@@ -0,0 +1,59 @@
+"""
+Token authentication with a cache in front of the Token/User lookup.
+
+A hit authenticates without touching the database. Entries expire after
+``TOKEN_CACHE_TIMEOUT`` seconds and are evicted explicitly whenever a token
+is created, rotated or deleted, or its user is saved (e.g. deactivated);
+see ``accounts.signals``.
+
+Eviction only works if every worker reads the same cache, so caching is
+skipped (every request hits the database) while ``CACHES['default']`` is
+process-local; the ``accounts.W001`` system check warns about it.
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_KEY = 'accounts:token:{}'
+USER_TOKEN_KEY = 'accounts:token-of:{}'
+
+
+def get_timeout():
+    return getattr(settings, 'TOKEN_CACHE_TIMEOUT', 300)
+
+
+def cache_is_shared():
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def evict_token(key):
+    cache.delete(TOKEN_KEY.format(key))
+
+
+def evict_user(user_id):
+    key = cache.get(USER_TOKEN_KEY.format(user_id))
+    if key is not None:
+        cache.delete_many([TOKEN_KEY.format(key), USER_TOKEN_KEY.format(user_id)])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if not cache_is_shared():
+            return super().authenticate_credentials(key)
+
+        # The cached token carries its user, loaded by select_related.
+        token = cache.get(TOKEN_KEY.format(key))
+        if token is not None:
+            if not token.user.is_active:
+                raise AuthenticationFailed('User inactive or deleted.')
+            return (token.user, token)
+
+        user, token = super().authenticate_credentials(key)
+        cache.set_many({
+            TOKEN_KEY.format(key): token,
+            USER_TOKEN_KEY.format(user.pk): key,
+        }, get_timeout())
+        return (user, token)
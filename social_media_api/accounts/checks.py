@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core import checks
+
+from .authentication import cache_is_shared
+
+AUTH_CLASS = 'accounts.authentication.CachedTokenAuthentication'
+
+
+@checks.register(checks.Tags.caches, checks.Tags.security)
+def check_token_cache(app_configs, **kwargs):
+    classes = getattr(settings, 'REST_FRAMEWORK', {}).get('DEFAULT_AUTHENTICATION_CLASSES', [])
+    if AUTH_CLASS not in classes or cache_is_shared():
+        return []
+    return [checks.Warning(
+        "CachedTokenAuthentication is not caching: CACHES['default'] is process-local.",
+        hint="Configure a cache shared by all workers (e.g. Redis) so revoked tokens are evicted everywhere.",
+        id='accounts.W001',
+    )]
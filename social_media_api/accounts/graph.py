@@ -0,0 +1,130 @@
+"""
+In-process cache of the follow graph.
+
+Adjacency is kept as plain int sets per user (never ORM instances) in a
+bounded LRU, so follower/following counts and follow/mutual checks are O(1)
+once a user is loaded. Cached sets are patched in place on follow/unfollow
+through ``m2m_changed`` (see ``accounts.signals``) and expire after
+``TIMEOUT`` seconds to bound staleness across worker processes.
+
+Because of that staleness the graph is for reads only (counts, follow
+buttons, feed merging). Writes that must reach every follower, such as
+timeline fan-out, read the follow table directly.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+DEFAULTS = {
+    # Adjacency sets kept in memory; each user has one per direction.
+    'MAX_ENTRIES': 20000,
+    'TIMEOUT': 300,
+}
+
+FOLLOWERS = 'followers'
+FOLLOWING = 'following'
+
+
+def get_setting(name):
+    return getattr(settings, 'FOLLOW_GRAPH', {}).get(name, DEFAULTS[name])
+
+
+class FollowGraph:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every patch and invalidation, so a load that raced one
+        # is not stored over it.
+        self._generation = 0
+
+    def _load(self, user_id, direction):
+        User = get_user_model()
+        field = User.followers.field
+        through = User.followers.through
+        # Each through row links a user (source) to one of their followers (target).
+        source, target = field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+        if direction == FOLLOWERS:
+            rows = through.objects.filter(**{source: user_id}).values_list(target, flat=True)
+        else:
+            rows = through.objects.filter(**{target: user_id}).values_list(source, flat=True)
+        return set(rows)
+
+    def _get(self, user_id, direction):
+        key = (direction, user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation
+
+        ids = self._load(user_id, direction)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            if self._generation != generation:
+                # A follow or unfollow landed during the load; serve the
+                # result but leave caching to the next read.
+                return ids
+            self._entries[key] = (now + get_setting('TIMEOUT'), ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > get_setting('MAX_ENTRIES'):
+                self._entries.popitem(last=False)
+        return ids
+
+    def followers(self, user_id):
+        return frozenset(self._get(user_id, FOLLOWERS))
+
+    def following(self, user_id):
+        return frozenset(self._get(user_id, FOLLOWING))
+
+    def follower_count(self, user_id):
+        return len(self._get(user_id, FOLLOWERS))
+
+    def following_count(self, user_id):
+        return len(self._get(user_id, FOLLOWING))
+
+    def is_following(self, follower_id, author_id):
+        return author_id in self._get(follower_id, FOLLOWING)
+
+    def is_mutual(self, user_id, other_id):
+        return self.is_following(user_id, other_id) and self.is_following(other_id, user_id)
+
+    def _patch(self, key, user_id, add):
+        self._generation += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            if add:
+                entry[1].add(user_id)
+            else:
+                entry[1].discard(user_id)
+
+    def followed(self, follower_id, author_id):
+        with self._lock:
+            self._patch((FOLLOWERS, author_id), follower_id, add=True)
+            self._patch((FOLLOWING, follower_id), author_id, add=True)
+
+    def unfollowed(self, follower_id, author_id):
+        with self._lock:
+            self._patch((FOLLOWERS, author_id), follower_id, add=False)
+            self._patch((FOLLOWING, follower_id), author_id, add=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop((FOLLOWERS, user_id), None)
+                self._entries.pop((FOLLOWING, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+follow_graph = FollowGraph()
@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from accounts.authentication import CachedTokenAuthentication, TOKEN_KEY
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure per-request token authentication overhead with and without the cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+
+    def handle(self, *args, iterations, **options):
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='bench-token-auth', password=None)
+                token = Token.objects.create(user=user)
+                request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+                for authenticator in (TokenAuthentication(), CachedTokenAuthentication()):
+                    self.report(authenticator, request, iterations)
+                cache.delete(TOKEN_KEY.format(token.key))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, authenticator, request, iterations):
+        authenticator.authenticate(request)  # warm up
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                authenticator.authenticate(request)
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{type(authenticator).__name__:<28} "
+            f"{elapsed / iterations * 1e6:8.1f} us/request "
+            f"{len(queries) / iterations:5.2f} queries/request"
+        )
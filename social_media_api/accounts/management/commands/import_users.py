@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.registration import bulk_register, read_rows
+
+
+class Command(BaseCommand):
+    help = "Register users in bulk from a CSV (with header) or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (default: one per core, 1 hashes inline).")
+
+    def handle(self, *args, path, batch_size, workers, **options):
+        start = time.perf_counter()
+        created, skipped, errors = bulk_register(read_rows(path), batch_size=batch_size, workers=workers)
+        elapsed = time.perf_counter() - start
+        for error in errors:
+            problems = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error['errors'].items())
+            self.stderr.write(f"Row {error['index'] + 1}: {problems}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} user(s), skipped {skipped}, rejected {len(errors)} in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,119 @@
+"""
+Bulk user registration for onboarding imports.
+
+Passwords are hashed in batches on a process pool (hashing dominates the
+cost of creating a user), then each batch is written with one
+``bulk_create`` for users and one for their tokens inside a transaction.
+
+Every row is checked first (``check_row``): missing required columns and
+passwords rejected by ``AUTH_PASSWORD_VALIDATORS`` are reported as
+per-row errors and the row is not registered.
+"""
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+REQUIRED_FIELDS = ('username', 'password')
+
+
+def read_rows(path):
+    """Yield user dicts from a ``.csv`` (with a header row) or ``.jsonl`` file."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def check_row(row):
+    """Problems with one input row as ``{field: [messages]}``; empty if it can be registered."""
+    errors = {field: ['This field is required.'] for field in REQUIRED_FIELDS if not row.get(field)}
+    if not errors:
+        try:
+            validate_password(row['password'], user=User(username=row['username'], email=row.get('email') or ''))
+        except ValidationError as exc:
+            errors['password'] = list(exc.messages)
+    return errors
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _new_token(user):
+    # bulk_create skips Token.save(), which is where keys are normally made.
+    token = Token(user=user)
+    token.key = token.generate_key()
+    return token
+
+
+def bulk_register(rows, batch_size=1000, workers=None):
+    """
+    Create users and tokens for ``rows`` (dicts with username, password and
+    optional email/bio). Usernames that already exist, or repeat within the
+    input, are skipped. Returns ``(created, skipped, errors)``, where
+    ``errors`` lists ``{'index': n, 'errors': {field: [messages]}}`` for the
+    rows that failed ``check_row``.
+    """
+    created = skipped = 0
+    errors = []
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    seen = set()
+    try:
+        for batch in _batches(enumerate(rows), batch_size):
+            valid = []
+            for index, row in batch:
+                row_errors = check_row(row)
+                if row_errors:
+                    errors.append({'index': index, 'errors': row_errors})
+                else:
+                    valid.append(row)
+
+            usernames = [row['username'] for row in valid]
+            taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+            fresh = []
+            for row in valid:
+                if row['username'] in taken or row['username'] in seen:
+                    skipped += 1
+                    continue
+                seen.add(row['username'])
+                fresh.append(row)
+            if not fresh:
+                continue
+
+            passwords = [row['password'] for row in fresh]
+            if executor is None:
+                hashed = list(map(make_password, passwords))
+            else:
+                hashed = list(executor.map(make_password, passwords, chunksize=max(len(passwords) // 32, 1)))
+
+            users = [
+                User(username=row['username'], email=row.get('email') or '', bio=row.get('bio') or '', password=password)
+                for row, password in zip(fresh, hashed)
+            ]
+            with transaction.atomic():
+                users = User.objects.bulk_create(users)
+                Token.objects.bulk_create([_new_token(user) for user in users])
+            created += len(users)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return created, skipped, errors
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField()  # ← MUST be exactly this
@@ -9,17 +10,34 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = get_user_model()
         fields = ['username', 'email', 'password', 'bio', 'profile_picture']
 
+    @transaction.atomic
     def create(self, validated_data):
+        # One INSERT for the user (profile fields included) and one for the token.
         user = get_user_model().objects.create_user(  # ← MUST be exactly this
             username=validated_data['username'],
             email=validated_data.get('email'),
-            password=validated_data['password']
+            password=validated_data['password'],
+            bio=validated_data.get('bio', ''),
+            profile_picture=validated_data.get('profile_picture', None),
         )
-        user.bio = validated_data.get('bio', '')
-        user.profile_picture = validated_data.get('profile_picture', None)
-        user.save()
 
+        # Also primes user.auth_token for RegisterView.
         Token.objects.create(user=user)
 
         return user
 
+
+class BulkRegisterSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(write_only=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        from .registration import check_row
+
+        errors = check_row(attrs)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
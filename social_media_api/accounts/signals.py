@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import evict_token, evict_user
+from .graph import follow_graph
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def sync_follow_graph(sender, instance, action, reverse, pk_set, **kwargs):
+    # user.following.add(author) is the reverse side of author.followers.add(user).
+    if action in ('post_add', 'post_remove'):
+        update = follow_graph.followed if action == 'post_add' else follow_graph.unfollowed
+        for pk in pk_set:
+            follower_id, author_id = (instance.pk, pk) if reverse else (pk, instance.pk)
+            update(follower_id, author_id)
+    elif action == 'post_clear':
+        follow_graph.clear()
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance, **kwargs):
+    evict_token(instance.key)
+    evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def evict_cached_user(sender, instance, created, **kwargs):
+    # Cached tokens carry a copy of the user, so any change (is_active,
+    # profile fields) must drop it.
+    if not created:
+        evict_user(instance.pk)
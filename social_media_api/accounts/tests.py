@@ -1,3 +1,186 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .checks import check_token_cache
+from .graph import follow_graph
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FollowGraphTestCase(APITestCase):
+    """Tests for the in-memory follow graph cache"""
+
+    def setUp(self):
+        follow_graph.clear()
+        self.alice = User.objects.create_user(username="alice", password="password123")
+        self.bob = User.objects.create_user(username="bob", password="password123")
+        self.client.force_authenticate(self.alice)
+
+    def test_follow_views_patch_cached_sets(self):
+        self.assertEqual(follow_graph.follower_count(self.bob.pk), 0)
+        self.assertEqual(follow_graph.following_count(self.alice.pk), 0)
+        self.assertEqual(follow_graph.following_count(self.bob.pk), 0)
+
+        response = self.client.post(reverse("follow", args=[self.bob.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(follow_graph.followers(self.bob.pk), {self.alice.pk})
+            self.assertTrue(follow_graph.is_following(self.alice.pk, self.bob.pk))
+            self.assertFalse(follow_graph.is_mutual(self.alice.pk, self.bob.pk))
+
+        self.client.post(reverse("unfollow", args=[self.bob.pk]))
+        with self.assertNumQueries(0):
+            self.assertEqual(follow_graph.follower_count(self.bob.pk), 0)
+
+    def test_mutual_follow_via_forward_side(self):
+        self.alice.followers.add(self.bob)
+        self.bob.followers.add(self.alice)
+        self.assertTrue(follow_graph.is_mutual(self.alice.pk, self.bob.pk))
+
+    def test_lru_is_bounded(self):
+        with self.settings(FOLLOW_GRAPH={"MAX_ENTRIES": 2}):
+            follow_graph.followers(self.alice.pk)
+            follow_graph.following(self.alice.pk)
+            follow_graph.followers(self.bob.pk)
+            self.assertEqual(len(follow_graph._entries), 2)
+
+    def test_load_racing_a_follow_is_not_cached(self):
+        load = follow_graph._load
+
+        def racing_load(user_id, direction):
+            ids = load(user_id, direction)
+            self.bob.followers.add(self.alice)  # lands while the stale set is in flight
+            return ids
+
+        follow_graph._load = racing_load
+        try:
+            self.assertEqual(follow_graph.followers(self.bob.pk), set())
+        finally:
+            del follow_graph._load
+        self.assertEqual(follow_graph.followers(self.bob.pk), {self.alice.pk})
+
+
+SHARED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(prefix="token-cache-"),
+    }
+}
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, CACHES=SHARED_CACHE)
+class CachedTokenAuthenticationTestCase(APITestCase):
+    """Tests for the cached token authentication class"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_second_request_skips_token_lookup(self):
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["username"], "testuser")
+
+    def test_deactivated_user_is_evicted(self):
+        self.client.get(reverse("profile"))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_is_evicted(self):
+        self.client.get(reverse("profile"))
+        self.token.delete()
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_process_local_cache_is_not_used(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.client.get(reverse("profile"))
+            with self.assertNumQueries(1):
+                self.client.get(reverse("profile"))
+            self.assertEqual([error.id for error in check_token_cache(None)], ["accounts.W001"])
+        self.assertEqual(check_token_cache(None), [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RegistrationTestCase(APITestCase):
+    """Tests for single and bulk registration"""
+
+    def test_register_returns_token(self):
+        data = {"username": "newuser", "email": "new@example.com", "password": "password123", "bio": "Hi"}
+        response = self.client.post(reverse("register"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        user = User.objects.get(username="newuser")
+        self.assertEqual(user.bio, "Hi")
+        self.assertTrue(user.check_password("password123"))
+        self.assertEqual(response.data["token"], Token.objects.get(user=user).key)
+
+    def test_bulk_register_endpoint_requires_admin(self):
+        payload = [
+            {"username": "bulk1", "password": "quiet-harbor-41"},
+            {"username": "bulk2", "password": "quiet-harbor-42"},
+        ]
+        self.assertEqual(
+            self.client.post(reverse("register-bulk"), payload, format="json").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+        admin = User.objects.create_superuser(username="admin", password="password123")
+        self.client.force_authenticate(admin)
+        response = self.client.post(reverse("register-bulk"), payload + payload[:1], format="json")
+        self.assertEqual(response.data, {"created": 2, "skipped": 1})
+        self.assertEqual(Token.objects.filter(user__username__startswith="bulk").count(), 2)
+
+    def test_import_users_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as handle:
+            for n in range(5):
+                handle.write(json.dumps({"username": f"imported{n}", "password": f"quiet-harbor-{n}"}) + "\n")
+            handle.flush()
+            call_command("import_users", handle.name, batch_size=2, workers=2, stdout=StringIO())
+
+        self.assertEqual(User.objects.filter(username__startswith="imported").count(), 5)
+        self.assertTrue(User.objects.get(username="imported3").check_password("quiet-harbor-3"))
+
+    def test_bulk_register_rejects_invalid_rows(self):
+        admin = User.objects.create_superuser(username="admin", password="password123")
+        self.client.force_authenticate(admin)
+        payload = [{"username": "bulk1", "password": "pw"}, {"password": "quiet-harbor-41"}]
+        response = self.client.post(reverse("register-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("password", response.data[0])
+        self.assertIn("username", response.data[1])
+        self.assertFalse(User.objects.filter(username="bulk1").exists())
+
+    def test_import_users_reports_invalid_rows(self):
+        rows = [
+            {"username": "imported0", "password": "quiet-harbor-0"},
+            {"username": "imported1", "password": "12345678"},
+            {"password": "quiet-harbor-2"},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as handle:
+            handle.writelines(json.dumps(row) + "\n" for row in rows)
+            handle.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command("import_users", handle.name, workers=1, stdout=stdout, stderr=stderr)
+
+        self.assertEqual(list(User.objects.filter(username__startswith="imported").values_list("username", flat=True)),
+                         ["imported0"])
+        self.assertIn("Row 2: password:", stderr.getvalue())
+        self.assertIn("Row 3: username: This field is required.", stderr.getvalue())
+        self.assertIn("rejected 2", stdout.getvalue())
@@ -1,10 +1,13 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
 
-from .serializers import RegisterSerializer
+from .models import CustomUser
+from .registration import bulk_register
+from .serializers import RegisterSerializer, BulkRegisterSerializer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -15,11 +18,23 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        user = User.objects.get(username=response.data['username'])
-        token, _ = Token.objects.get_or_create(user=user)
-        response.data['token'] = token.key
-        return response
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # RegisterSerializer creates the token in the same transaction.
+        user = serializer.save()
+        data = dict(serializer.data, token=user.auth_token.key)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class BulkRegisterView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkRegisterSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        # Hash inline; large imports should use the import_users command.
+        created, skipped, _ = bulk_register(serializer.validated_data, workers=1)
+        return Response({'created': created, 'skipped': skipped}, status=status.HTTP_201_CREATED)
 
 
 class LoginView(APIView):
@@ -7,6 +7,13 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 
 User = get_user_model()
 
+
+class NotificationQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join everything ``__str__`` and the API touch except the generic target."""
+        return self.select_related('actor', 'recipient', 'target_content_type')
+
+
 class Notification(models.Model):
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='actions')
@@ -19,6 +26,42 @@ class Notification(models.Model):
 
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    # Number of actors coalesced into this notification; `actor` is the latest.
+    actor_count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', 'is_read'], name='notification_unread_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.actor.username} {self.verb} -> {self.recipient.username}"
+        return f"{self.actor_display} {self.verb} -> {self.recipient.username}"
 
+    @property
+    def actor_display(self):
+        others = self.actor_count - 1
+        if others <= 0:
+            return self.actor.username
+        return f"{self.actor.username} and {others} other{'s' if others > 1 else ''}"
+
+
+
+class NotificationActor(models.Model):
+    """
+    One row per distinct actor coalesced into a notification, so repeated
+    events from the same actor (like, unlike, like) count once.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='actor_links')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'actor'], name='notification_actor_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_id} -> {self.notification_id}"
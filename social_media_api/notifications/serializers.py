@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    actor = serializers.ReadOnlyField(source='actor.username')
+    target_type = serializers.ReadOnlyField(source='target_content_type.model')
+    target_id = serializers.ReadOnlyField(source='target_object_id')
+    target = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'actor', 'actor_count', 'verb', 'target_type', 'target_id', 'target',
+                  'timestamp', 'is_read']
+
+    def get_target(self, obj):
+        return str(obj.target) if obj.target is not None else None
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
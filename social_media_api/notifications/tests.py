@@ -1,3 +1,166 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from posts.models import Post, Comment
+from .models import Notification
+from .prefetch import prefetch_targets
+from .writer import NotificationWriter
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, NOTIFICATIONS={"ASYNC": False})
+class NotificationWriterTestCase(APITestCase):
+    """Tests for the batched, coalescing notification writer"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.post = Post.objects.create(author=self.author, title="Post", content="...")
+
+    def test_like_notification_is_written_on_commit(self):
+        fan = User.objects.create_user(username="fan", password="password123")
+        self.client.force_authenticate(fan)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("like-post", args=[self.post.id]))
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor, fan)
+        self.assertEqual(str(notification), "fan liked your post -> author")
+
+    def test_events_coalesce_within_window(self):
+        writer = NotificationWriter()
+        fans = [
+            User.objects.create_user(username=f"fan{n}", password="password123")
+            for n in range(3)
+        ]
+        post_type = ContentType.objects.get_for_model(Post)
+
+        with override_settings(NOTIFICATIONS={"ASYNC": True, "FLUSH_INTERVAL": 60}):
+            for fan in fans[:2]:
+                writer.add(self.author.pk, fan.pk, "liked your post", post_type.pk, self.post.pk)
+            writer.add(self.author.pk, fans[0].pk, "liked your post", post_type.pk, self.post.pk)
+            self.assertEqual(writer.flush(), 1)
+            self.assertEqual(Notification.objects.get().actor_count, 2)
+
+        writer.add(self.author.pk, fans[2].pk, "liked your post", post_type.pk, self.post.pk)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(str(notification), "fan2 and 2 others liked your post -> author")
+
+    def test_repeat_actor_across_flushes_counts_once(self):
+        writer = NotificationWriter()
+        fan = User.objects.create_user(username="fan", password="password123")
+        post_type = ContentType.objects.get_for_model(Post)
+        for _ in range(3):  # like, unlike, like again...
+            writer.add(self.author.pk, fan.pk, "liked your post", post_type.pk, self.post.pk)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 1)
+        self.assertEqual(str(notification), "fan liked your post -> author")
+
+    def test_background_flush_failures_are_logged(self):
+        writer = NotificationWriter()
+        writer.flush = lambda: 1 / 0
+        with self.assertLogs("notifications.writer", level="ERROR") as logs:
+            writer._submit()
+            writer._executor.shutdown(wait=True)
+        self.assertIn("ZeroDivisionError", logs.output[0])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class NotificationAPITestCase(APITestCase):
+    """Tests for the notifications list, unread badge and mark-read endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.actor = User.objects.create_user(username="actor", password="password123")
+        self.post = Post.objects.create(author=self.user, title="Post", content="...")
+        self.notifications = [
+            Notification.objects.create(
+                recipient=self.user, actor=self.actor, verb="liked your post", target=self.post
+            )
+            for _ in range(3)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def test_list_notifications(self):
+        response = self.client.get(reverse("notification-list"), {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [n["id"] for n in response.data["results"]],
+            [self.notifications[2].id, self.notifications[1].id],
+        )
+        self.assertEqual(response.data["results"][0]["target_type"], "post")
+        self.assertIsNotNone(response.data["next"])
+
+    def test_unread_count_is_served_from_cache(self):
+        url = reverse("notification-unread-count")
+        self.assertEqual(self.client.get(url).data["unread"], 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data["unread"], 3)
+
+    def test_mark_read_updates_cached_count(self):
+        url = reverse("notification-unread-count")
+        self.client.get(url)
+
+        response = self.client.post(
+            reverse("notification-mark-read"), {"ids": [self.notifications[0].id]}, format="json"
+        )
+        self.assertEqual(response.data["marked_read"], 1)
+        self.assertEqual(self.client.get(url).data["unread"], 2)
+
+        self.client.post(reverse("notification-mark-all-read"))
+        self.assertEqual(self.client.get(url).data["unread"], 0)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_mark_read_rejects_non_integer_ids(self):
+        url = reverse("notification-mark-read")
+        for payload in ({"ids": ["abc"]}, {"ids": "1,2"}):
+            response = self.client.post(url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("ids", response.data)
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 3)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class NotificationPrefetchTestCase(APITestCase):
+    """Query-count regression tests for rendering notification lists"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.actor = User.objects.create_user(username="actor", password="password123")
+        self.client.force_authenticate(self.user)
+        # Warm the content type cache so only notification queries are counted.
+        ContentType.objects.get_for_models(Post, Comment)
+
+    def notify_about(self, count):
+        for n in range(count):
+            post = Post.objects.create(author=self.user, title=f"Post {n}", content="...")
+            comment = Comment.objects.create(post=post, author=self.actor, content="...")
+            for target, verb in ((post, "liked your post"), (comment, "replied")):
+                Notification.objects.create(recipient=self.user, actor=self.actor, verb=verb, target=target)
+
+    def test_list_query_count_is_constant(self):
+        self.notify_about(2)
+        # One for the page, one per target content type.
+        with self.assertNumQueries(3):
+            self.client.get(reverse("notification-list"))
+
+        self.notify_about(8)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("notification-list"))
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_rendering_touches_no_further_rows(self):
+        self.notify_about(5)
+        with self.assertNumQueries(3):
+            notifications = prefetch_targets(Notification.objects.with_related())
+            rendered = [(str(n), n.target.author.username) for n in notifications]
+        self.assertEqual(len(rendered), 10)
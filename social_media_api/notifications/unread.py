@@ -0,0 +1,43 @@
+"""
+Per-recipient unread notification counters.
+
+The badge count is served from the cache and adjusted incrementally as
+notifications are written and marked read, so polling it never touches the
+notifications table. A missing key is rebuilt with one indexed COUNT.
+
+Counters live in the shared ``default`` cache (see ``CACHES`` in settings)
+so every worker sees the same increments. They also expire after
+``TIMEOUT`` seconds, which bounds how long a lost update can skew a badge.
+"""
+from django.core.cache import cache
+
+from .models import Notification
+
+CACHE_KEY = 'notifications:unread:{}'
+TIMEOUT = 5 * 60
+
+
+def get_unread_count(user_id):
+    key = CACHE_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.add(key, count, TIMEOUT)
+    return count
+
+
+def adjust_unread(user_id, delta):
+    """Shift a cached counter by ``delta``; uncached counters are left to be rebuilt."""
+    if not delta:
+        return
+    key = CACHE_KEY.format(user_id)
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        return
+    if count < 0:
+        cache.delete(key)
+
+
+def set_unread(user_id, count):
+    cache.set(CACHE_KEY.format(user_id), count, TIMEOUT)
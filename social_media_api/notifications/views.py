@@ -1,3 +1,56 @@
-from django.shortcuts import render
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from posts.pagination import KeysetPagination
+from .models import Notification
+from .prefetch import prefetch_targets
+from .serializers import MarkReadSerializer, NotificationSerializer
+from .unread import adjust_unread, get_unread_count, set_unread
+
+
+class NotificationPagination(KeysetPagination):
+    cursor_field = 'timestamp'
+
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).with_related()
+
+    def paginate_queryset(self, queryset):
+        # Generic targets are loaded with one query per content type.
+        return prefetch_targets(super().paginate_queryset(queryset))
+
+
+class UnreadCountView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread': get_unread_count(request.user.pk)})
+
+
+class MarkReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        updated = Notification.objects.filter(
+            recipient=request.user, is_read=False, pk__in=ids,
+        ).update(is_read=True)
+        adjust_unread(request.user.pk, -updated)
+        return Response({'marked_read': updated})
+
+
+class MarkAllReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        updated = Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        set_unread(request.user.pk, 0)
+        return Response({'marked_read': updated})
@@ -0,0 +1,193 @@
+"""
+Batched, coalescing notification writer.
+
+Views call ``notify()`` instead of creating ``Notification`` rows inline.
+Events are buffered in process and flushed on a background thread with one
+``bulk_create``/``bulk_update`` per batch. Events sharing a recipient, verb
+and target are coalesced into one notification ("X and 41 others liked your
+post"), both inside a batch and against unread rows written within
+``COALESCE_WINDOW`` seconds. Each distinct actor is recorded in
+``NotificationActor``, and ``actor_count`` is recounted from those rows,
+so the same actor repeating an event across flushes counts once.
+
+Set ``NOTIFICATIONS['ASYNC'] = False`` to flush synchronously, e.g. in tests.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Notification, NotificationActor
+from .unread import adjust_unread
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ASYNC': True,
+    # Seconds an event may wait in the buffer before it is written.
+    'FLUSH_INTERVAL': 2.0,
+    # Buffered events that trigger an immediate flush.
+    'MAX_BATCH': 500,
+    # Events for the same recipient/verb/target within this many seconds
+    # are merged into one notification.
+    'COALESCE_WINDOW': 3600,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'NOTIFICATIONS', {}).get(name, DEFAULTS[name])
+
+
+class NotificationWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._size = 0
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notifications')
+
+    def add(self, recipient_id, actor_id, verb, content_type_id, object_id):
+        key = (recipient_id, verb, content_type_id, object_id)
+        run_async = get_setting('ASYNC')
+        with self._lock:
+            actors = self._pending.setdefault(key, [])
+            if actor_id in actors:
+                return
+            actors.append(actor_id)
+            self._size += 1
+            full = self._size >= get_setting('MAX_BATCH')
+            if run_async and not full and self._timer is None:
+                self._timer = threading.Timer(get_setting('FLUSH_INTERVAL'), self._submit)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if not run_async:
+            self.flush()
+        elif full:
+            self._submit()
+
+    def _submit(self):
+        self._executor.submit(self._flush_in_worker).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future):
+        exc = future.exception()
+        if exc is not None:
+            logger.error("Flushing buffered notifications failed", exc_info=exc)
+
+    def _flush_in_worker(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending, self._size = self._pending, {}, 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return pending
+
+    @staticmethod
+    def _key(notification):
+        return (
+            notification.recipient_id, notification.verb,
+            notification.target_content_type_id, notification.target_object_id,
+        )
+
+    def flush(self):
+        """Write all buffered events. Returns the number of notifications touched."""
+        pending = self._drain()
+        if not pending:
+            return 0
+
+        since = timezone.now() - timedelta(seconds=get_setting('COALESCE_WINDOW'))
+        match = Q()
+        for recipient_id, verb, content_type_id, object_id in pending:
+            match |= Q(
+                recipient_id=recipient_id, verb=verb,
+                target_content_type_id=content_type_id, target_object_id=object_id,
+            )
+
+        with transaction.atomic():
+            existing = {}
+            recent = (
+                Notification.objects.filter(match, is_read=False, timestamp__gte=since)
+                .order_by('timestamp')
+            )
+            for notification in recent.select_for_update():
+                existing[self._key(notification)] = notification
+
+            now = timezone.now()
+            to_create, to_update = [], []
+            for key, actors in pending.items():
+                notification = existing.get(key)
+                if notification is None:
+                    recipient_id, verb, content_type_id, object_id = key
+                    to_create.append(Notification(
+                        recipient_id=recipient_id, actor_id=actors[-1], verb=verb,
+                        target_content_type_id=content_type_id, target_object_id=object_id,
+                        actor_count=len(actors),
+                    ))
+                else:
+                    notification.actor_id = actors[-1]
+                    notification.timestamp = now
+                    to_update.append(notification)
+
+            Notification.objects.bulk_create(to_create)
+            links = [
+                NotificationActor(notification=notification, actor_id=actor_id)
+                for notification in to_create + to_update
+                for actor_id in pending[self._key(notification)]
+            ]
+            NotificationActor.objects.bulk_create(links, ignore_conflicts=True)
+            if to_update:
+                counts = dict(
+                    NotificationActor.objects.filter(notification__in=to_update)
+                    .values('notification').annotate(actors=Count('pk'))
+                    .values_list('notification', 'actors')
+                )
+                for notification in to_update:
+                    notification.actor_count = counts[notification.pk]
+            Notification.objects.bulk_update(to_update, ['actor', 'actor_count', 'timestamp'])
+
+        created = Counter(notification.recipient_id for notification in to_create)
+        for recipient_id, count in created.items():
+            adjust_unread(recipient_id, count)
+        return len(to_create) + len(to_update)
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = NotificationWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def notify(recipient, actor, verb, target):
+    """Queue a notification; it is written once the current transaction commits."""
+    content_type_id = ContentType.objects.get_for_model(target).pk
+    writer = get_writer()
+    transaction.on_commit(
+        lambda: writer.add(recipient.pk, actor.pk, verb, content_type_id, target.pk)
+    )
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'posts'
+
+    def ready(self):
+        from notifications.prefetch import register_target
+        from . import signals  # noqa: F401
+        from .models import Post, Comment
+
+        register_target(Post, 'author')
+        register_target(Comment, 'author', 'post')
@@ -0,0 +1,151 @@
+"""
+Synthetic social graph and endpoint benchmark for ``benchmark_api``.
+
+``seed`` fills the database with users, a skewed follow graph (a few very
+popular accounts, a long tail of small ones), posts and likes using bulk
+inserts. ``run`` then drives the API through the test client and reports
+latency percentiles and queries per request for each endpoint. On
+PostgreSQL it also reports rows scanned, from ``EXPLAIN ANALYZE`` of the
+queries a sample request issued.
+"""
+import json
+import subprocess
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import counters
+from .models import Post, Comment, Like
+
+User = get_user_model()
+
+SCAN_NODES = {'Seq Scan', 'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'}
+
+
+def seed(rng, users=500, follows=30, posts=5, likes=3, prefix='bench'):
+    """
+    Create the synthetic graph. ``follows`` is the mean out-degree; who gets
+    followed is Zipf-distributed so a handful of accounts collect most
+    followers. ``posts`` and ``likes`` are per user and per post.
+    """
+    accounts = User.objects.bulk_create(
+        [User(username=f'{prefix}{n}', password='!') for n in range(users)]
+    )
+    ids = [user.pk for user in accounts]
+    popularity = [1 / (rank + 1) for rank in range(users)]
+
+    through = User.followers.through
+    field = User.followers.field
+    source, target = field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+    edges = []
+    for follower in ids:
+        # Pareto(1.5) has mean 3, so scale it to the requested mean.
+        fan_out = min(int(rng.paretovariate(1.5) * follows / 3), users - 1)
+        for author in set(rng.choices(ids, weights=popularity, k=fan_out)) - {follower}:
+            edges.append(through(**{source: author, target: follower}))
+    through.objects.bulk_create(edges, batch_size=5000)
+
+    created_posts = Post.objects.bulk_create(
+        [Post(author_id=author, title=f'Post {n}', content='Lorem ipsum ' * 20)
+         for author in ids for n in range(posts)],
+        batch_size=5000,
+    )
+    post_ids = [post.pk for post in created_posts]
+
+    Comment.objects.bulk_create(
+        [Comment(post_id=rng.choice(post_ids), author_id=rng.choice(ids), content='Nice')
+         for _ in range(len(post_ids))],
+        batch_size=5000,
+    )
+    pairs = {(rng.choice(post_ids), rng.choice(ids)) for _ in range(len(post_ids) * likes)}
+    Like.objects.bulk_create(
+        [Like(post_id=post_id, user_id=user_id) for post_id, user_id in pairs], batch_size=5000,
+    )
+    counters.reconcile()
+    return {'users': users, 'follows': len(edges), 'posts': len(post_ids), 'likes': len(pairs)}
+
+
+def scenarios(rng, user_ids, post_ids):
+    """Each scenario returns ``(method, path)`` for one request."""
+    return {
+        'feed': lambda: ('get', reverse('feed')),
+        'post_list': lambda: ('get', reverse('post-list')),
+        'comment_list': lambda: ('get', reverse('comment-list')),
+        'like': lambda: ('post', reverse('like-post', args=[rng.choice(post_ids)])),
+        'follow': lambda: ('post', reverse('follow', args=[rng.choice(user_ids)])),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def rows_scanned(queries):
+    if connection.vendor != 'postgresql':
+        return None
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute('EXPLAIN (ANALYZE, FORMAT JSON) ' + query['sql'])
+            plans = [cursor.fetchone()[0][0]['Plan']]
+            while plans:
+                plan = plans.pop()
+                if plan['Node Type'] in SCAN_NODES:
+                    total += plan['Actual Rows'] * plan['Actual Loops']
+                plans.extend(plan.get('Plans', []))
+    return total
+
+
+def run(rng, iterations=200):
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    users = User.objects.in_bulk(user_ids)
+    client = APIClient()
+
+    results = {}
+    for name, make_request in scenarios(rng, user_ids, post_ids).items():
+        latencies, query_counts, sample = [], [], None
+        for _ in range(iterations):
+            client.force_authenticate(users[rng.choice(user_ids)])
+            method, path = make_request()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                getattr(client, method)(path, secure=True)
+                latencies.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            sample = sample or queries.captured_queries
+        results[name] = {
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'queries_per_request': round(sum(query_counts) / len(query_counts), 2),
+            'rows_scanned_per_request': rows_scanned(sample or []),
+        }
+    return results
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(seeded, results, options):
+    return json.dumps({
+        'commit': current_commit(),
+        'database': connection.vendor,
+        'options': options,
+        'seeded': seeded,
+        'endpoints': results,
+    }, indent=2, sort_keys=True)
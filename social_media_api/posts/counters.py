@@ -0,0 +1,54 @@
+"""
+Denormalized like/comment counters on ``Post``.
+
+Counters are adjusted with a single ``UPDATE ... SET n = n + delta`` so
+concurrent likes never lose increments, and ``reconcile`` repairs any drift
+in bulk (e.g. rows deleted outside the API).
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Post, Comment, Like
+
+
+def adjust(post_id, field, delta):
+    if delta:
+        Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _count_subquery(model):
+    counts = (
+        model.objects.filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile(batch_size=1000):
+    """Recompute counters for posts whose stored values drifted. Returns the number fixed."""
+    actual_likes = _count_subquery(Like)
+    actual_comments = _count_subquery(Comment)
+
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1]
+
+        drifted = list(
+            Post.objects.filter(pk__in=batch)
+            .annotate(actual_likes=actual_likes, actual_comments=actual_comments)
+            .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+            .values_list('pk', flat=True)
+        )
+        if drifted:
+            fixed += Post.objects.filter(pk__in=drifted).update(
+                like_count=actual_likes, comment_count=actual_comments,
+            )
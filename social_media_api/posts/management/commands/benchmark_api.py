@@ -0,0 +1,60 @@
+import random
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.graph import follow_graph
+from posts import benchmark, timeline
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic social graph, drive the feed, like, follow and list "
+        "endpoints, and print latency percentiles and queries per request as JSON. "
+        "Seeded data is rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--follows', type=int, default=30, help="Mean follows per user.")
+        parser.add_argument('--posts', type=int, default=5, help="Posts per user.")
+        parser.add_argument('--likes', type=int, default=3, help="Likes per post.")
+        parser.add_argument('--iterations', type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--keep', action='store_true', help="Commit the seeded data.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        params = {name: options[name] for name in ('users', 'follows', 'posts', 'likes', 'iterations', 'seed')}
+
+        follow_graph.clear()
+        cache.delete(timeline.CELEBRITY_CACHE_KEY)
+        try:
+            with transaction.atomic():
+                seeded = benchmark.seed(
+                    rng, users=params['users'], follows=params['follows'],
+                    posts=params['posts'], likes=params['likes'],
+                )
+                call_command('rebuild_timelines', stdout=self.stderr)
+                results = benchmark.run(rng, iterations=params['iterations'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # In-process caches may now point at rolled-back rows.
+            follow_graph.clear()
+            cache.delete(timeline.CELEBRITY_CACHE_KEY)
+
+        output = benchmark.report(seeded, results, params)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        self.stdout.write(output)
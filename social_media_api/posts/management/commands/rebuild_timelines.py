@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild precomputed home timelines from the follow graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Only rebuild the timeline of this user id (repeatable).")
+
+    def handle(self, *args, user_ids=None, **options):
+        backend = timeline.get_backend()
+        max_length = timeline.get_setting('MAX_LENGTH')
+        celebrities = timeline.celebrity_ids()
+
+        users = User.objects.order_by('pk')
+        if user_ids:
+            users = users.filter(pk__in=user_ids)
+
+        rebuilt = 0
+        for user in users.iterator():
+            authors = user.following.exclude(pk__in=celebrities)
+            entries = list(
+                Post.objects.filter(author__in=authors)
+                .order_by('-created_at', '-id')
+                .values_list('created_at', 'id', 'author_id')[:max_length]
+            )
+            backend.clear(user.pk)
+            if entries:
+                backend.push([user.pk], entries)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timeline(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = "Repair drift in Post.like_count and Post.comment_count."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        fixed = counters.reconcile(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} post(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = "Cut every precomputed home timeline back to POSTS_TIMELINE['MAX_LENGTH'] entries."
+
+    def handle(self, *args, **options):
+        trimmed = timeline.trim_all()
+        self.stdout.write(self.style.SUCCESS(f"Trimmed {trimmed} timeline(s)."))
@@ -0,0 +1,106 @@
+import base64
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination over ``(cursor_field, id)``, newest first.
+
+    Each page is fetched with ``WHERE (cursor_field, id) < cursor ORDER BY
+    cursor_field DESC, id DESC LIMIT page_size + 1``. No OFFSET or COUNT(*) is
+    ever issued, and rows inserted while a client is paging are always newer
+    than its cursor, so they never shift or duplicate items on later pages.
+    """
+    cursor_query_param = 'cursor'
+    cursor_field = 'created_at'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE or 20
+    # Upper bound for ?page_size=; override in a subclass to change it.
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        def fetch(limit, before):
+            page = queryset if before is None else self.filter_before(queryset, before)
+            return list(page.order_by('-' + self.cursor_field, '-id')[:limit])
+
+        return self.paginate_fetch(fetch, request)
+
+    def paginate_fetch(self, fetch, request):
+        """
+        Paginate any source that can return ``limit`` objects older than a
+        ``(cursor_field, id)`` position, e.g. a precomputed timeline.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        before = self.decode_cursor(request)
+
+        results = fetch(self.page_size + 1, before)
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def filter_before(self, queryset, before):
+        position, pk = before
+        return queryset.filter(
+            Q(**{self.cursor_field + '__lt': position}) | Q(**{self.cursor_field: position, 'id__lt': pk})
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            created_at = parse_datetime(tokens['t'][0])
+            pk = int(tokens['i'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def encode_cursor(self, obj):
+        position = getattr(obj, self.cursor_field)
+        querystring = parse.urlencode({'t': position.isoformat(), 'i': obj.pk})
+        encoded = base64.urlsafe_b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from . import timeline
+from .models import Post
+
+User = get_user_model()
+
+
+def _follow_pairs(instance, reverse, pk_set):
+    """
+    Yield ``(follower_id, author_id)`` pairs for a change to ``User.followers``.
+
+    ``author.followers.add(user)`` is the forward side and
+    ``user.following.add(author)`` the reverse side of the same relation.
+    """
+    for pk in pk_set:
+        yield (instance.pk, pk) if reverse else (pk, instance.pk)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def sync_timelines_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    backend = timeline.get_backend()
+    if action == 'post_add':
+        for follower_id, author_id in _follow_pairs(instance, reverse, pk_set):
+            timeline.backfill(follower_id, author_id)
+    elif action == 'post_remove':
+        for follower_id, author_id in _follow_pairs(instance, reverse, pk_set):
+            backend.remove_author(follower_id, author_id)
+    elif action == 'pre_clear':
+        if reverse:
+            pk_set = instance.following.values_list('pk', flat=True)
+        else:
+            pk_set = instance.followers.values_list('pk', flat=True)
+        for follower_id, author_id in _follow_pairs(instance, reverse, list(pk_set)):
+            backend.remove_author(follower_id, author_id)
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_post(sender, instance, **kwargs):
+    timeline.get_backend().remove_posts([instance.pk])
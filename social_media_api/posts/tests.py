@@ -1,3 +1,227 @@
-from django.test import TestCase
+import json
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.graph import follow_graph
+from . import timeline
+from .models import Post, Comment, Like, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TimelineTestCase(APITestCase):
+    """Tests for the precomputed home timeline behind FeedView"""
+
+    def setUp(self):
+        cache.clear()
+        follow_graph.clear()
+        self.reader = User.objects.create_user(username="reader", password="password123")
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.other = User.objects.create_user(username="other", password="password123")
+        self.reader.following.add(self.author)
+
+    def publish(self, author, title):
+        post = Post.objects.create(author=author, title=title, content="...")
+        timeline.fan_out_post(post)
+        return post
+
+    # --------------------
+    # FAN-OUT ON WRITE
+    # --------------------
+    def test_post_is_pushed_to_followers(self):
+        post = self.publish(self.author, "Hello")
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.other).exists())
+
+    def test_fan_out_reads_followers_from_the_database(self):
+        follow_graph.followers(self.author.pk)  # cached without the new follower below
+        User.followers.through.objects.create(from_customuser=self.author, to_customuser=self.other)
+        post = self.publish(self.author, "Hello")
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.other, post=post).exists())
+
+    def test_feed_reads_timeline_newest_first(self):
+        first = self.publish(self.author, "First")
+        second = self.publish(self.author, "Second")
+        self.publish(self.other, "Not followed")
+
+        self.client.force_authenticate(self.reader)
+        response = self.client.get(reverse("feed"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["id"] for p in response.data["results"]], [second.id, first.id])
+
+    # --------------------
+    # FOLLOW / UNFOLLOW
+    # --------------------
+    def test_follow_backfills_and_unfollow_removes(self):
+        post = Post.objects.create(author=self.other, title="Earlier", content="...")
+        self.reader.following.add(self.other)
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+
+        self.reader.following.remove(self.other)
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+
+    # --------------------
+    # CELEBRITY PULL
+    # --------------------
+    @override_settings(POSTS_TIMELINE={"CELEBRITY_THRESHOLD": 2})
+    def test_celebrity_posts_are_merged_at_read_time(self):
+        friend = User.objects.create_user(username="friend", password="password123")
+        self.reader.following.add(friend)
+        self.other.following.add(self.author)
+        cache.clear()
+
+        regular = self.publish(friend, "Regular")
+        celebrity_post = self.publish(self.author, "Celebrity")
+        self.assertFalse(TimelineEntry.objects.filter(post=celebrity_post).exists())
+
+        posts = timeline.read_timeline(self.reader, limit=10)
+        self.assertEqual([p.id for p in posts], [celebrity_post.id, regular.id])
+
+    @override_settings(POSTS_TIMELINE={"CELEBRITY_THRESHOLD": 2, "ASYNC": False})
+    def test_posts_survive_an_author_leaving_the_celebrity_set(self):
+        self.other.following.add(self.author)
+        cache.clear()
+        pulled = self.publish(self.author, "Pulled")
+        self.assertFalse(TimelineEntry.objects.filter(post=pulled).exists())
+
+        self.other.following.remove(self.author)
+        cache.delete(timeline.CELEBRITY_CACHE_KEY)  # the cached set expires
+        with self.captureOnCommitCallbacks(execute=True):
+            # Still pulled while the backfill waits for the commit.
+            self.assertEqual([p.id for p in timeline.read_timeline(self.reader, limit=10)], [pulled.id])
+            self.assertFalse(TimelineEntry.objects.filter(post=pulled).exists())
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=pulled).exists())
+        self.assertNotIn(self.author.pk, timeline.celebrity_ids())
+        self.assertEqual([p.id for p in timeline.read_timeline(self.reader, limit=10)], [pulled.id])
+
+    @override_settings(POSTS_TIMELINE={"MAX_LENGTH": 2})
+    def test_trim_command_caps_database_timelines(self):
+        for n in range(4):
+            self.publish(self.author, f"Post {n}")
+        out = StringIO()
+        call_command("trim_timelines", stdout=out)
+        self.assertIn("Trimmed 1 timeline(s).", out.getvalue())
+        titles = [p.title for p in timeline.read_timeline(self.reader, limit=10)]
+        self.assertEqual(titles, ["Post 3", "Post 2"])
+
+
+@override_settings(POSTS_TIMELINE={"BACKEND": "posts.timeline.LocalMemoryTimelineBackend", "MAX_LENGTH": 3})
+class LocalMemoryTimelineBackendTestCase(TestCase):
+    def test_range_is_capped_and_keyset_ordered(self):
+        backend = timeline.get_backend()
+        backend.push([1], [(n, n, 7) for n in range(5)])
+
+        self.assertEqual(backend.range(1, 10), [(4, 4, 7), (3, 3, 7), (2, 2, 7)])
+        self.assertEqual(backend.range(1, 1, before=(4, 4)), [(3, 3, 7)])
+
+        backend.remove_author(1, 7)
+        self.assertEqual(backend.range(1, 10), [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class KeysetPaginationTestCase(APITestCase):
+    """Tests for cursor pagination on the posts list endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.posts = [
+            Post.objects.create(author=self.user, title=f"Post {n}", content="...")
+            for n in range(5)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_cursor_without_gaps(self):
+        response = self.client.get(reverse("post-list"), {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        seen = [p["id"] for p in response.data["results"]]
+
+        # Posts created mid-pagination must not shift later pages.
+        Post.objects.create(author=self.user, title="Newer", content="...")
+
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen += [p["id"] for p in response.data["results"]]
+
+        self.assertEqual(seen, [post.id for post in reversed(self.posts)])
+
+    def test_page_size_is_capped(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("post-list"), {"page_size": 10 ** 6})
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("post-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PostCountersTestCase(APITestCase):
+    """Tests for the denormalized like/comment counters on Post"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.post = Post.objects.create(author=self.user, title="Post", content="...")
+        self.client.force_authenticate(self.user)
+
+    def test_like_and_unlike_update_count(self):
+        self.client.post(reverse("like-post", args=[self.post.id]))
+        self.client.post(reverse("like-post", args=[self.post.id]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.client.post(reverse("unlike-post", args=[self.post.id]))
+        self.client.post(reverse("unlike-post", args=[self.post.id]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_comment_create_and_delete_update_count(self):
+        response = self.client.post(reverse("comment-list"), {"post": self.post.id, "content": "Nice"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+        self.client.delete(reverse("comment-detail", args=[response.data["id"]]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_moving_a_comment_moves_the_count(self):
+        other = Post.objects.create(author=self.user, title="Other", content="...")
+        response = self.client.post(reverse("comment-list"), {"post": self.post.id, "content": "Nice"})
+        url = reverse("comment-detail", args=[response.data["id"]])
+
+        self.client.patch(url, {"post": other.id})
+        self.client.put(url, {"post": other.id, "content": "Still nice"})
+        self.post.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.post.comment_count, other.comment_count), (0, 1))
+
+    def test_reconcile_command_repairs_drift(self):
+        Like.objects.create(post=self.post, user=self.user)
+        Comment.objects.create(post=self.post, author=self.user, content="...")
+        Post.objects.filter(pk=self.post.pk).update(like_count=7)
+
+        call_command("reconcile_post_counters", stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (1, 1))
+
+
+class BenchmarkCommandTestCase(TestCase):
+    def test_reports_every_endpoint_and_rolls_back(self):
+        out = StringIO()
+        call_command("benchmark_api", users=20, follows=4, iterations=3, stdout=out, stderr=StringIO())
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            set(report["endpoints"]), {"feed", "post_list", "comment_list", "like", "follow"}
+        )
+        self.assertIn("p99_ms", report["endpoints"]["feed"])
+        self.assertFalse(User.objects.filter(username__startswith="bench").exists())
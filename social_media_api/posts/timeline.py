@@ -0,0 +1,354 @@
+"""
+Precomputed home timelines (fan-out on write).
+
+When a post is created it is pushed into the timeline of every follower of
+its author, so reading a feed is one indexed range scan instead of a join
+over everyone the reader follows. Authors with at least
+``CELEBRITY_THRESHOLD`` followers are not fanned out; their posts are pulled
+and merged in when the feed is read.
+
+An author who drops below the threshold keeps being pulled until their
+recent posts have been pushed to their followers; that backfill runs after
+commit on a background thread (``POSTS_TIMELINE['ASYNC'] = False`` runs it
+on the committing thread, e.g. in tests).
+
+``DatabaseTimelineBackend`` does not cap timelines on every push (that
+would cost a range scan per follower per post); ``manage.py trim_timelines``
+cuts every timeline back to ``MAX_LENGTH`` and is meant to run periodically.
+
+Storage is pluggable through ``settings.POSTS_TIMELINE['BACKEND']``:
+
+* ``DatabaseTimelineBackend`` stores entries in ``TimelineEntry``.
+* ``LocalMemoryTimelineBackend`` keeps per-user sorted lists in process. Its
+  methods mirror sorted-set commands (ZADD / ZREVRANGEBYSCORE / ZREM) so a
+  Redis backend can implement the same interface.
+"""
+import bisect
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from accounts.graph import follow_graph
+from .models import Post, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'posts.timeline.DatabaseTimelineBackend',
+    # Backfill demoted celebrities on a background thread.
+    'ASYNC': True,
+    # Authors with at least this many followers are merged at read time.
+    'CELEBRITY_THRESHOLD': 10000,
+    # Entries kept per user; older posts fall off the timeline.
+    'MAX_LENGTH': 800,
+    # Posts copied into a timeline when the owner follows someone new.
+    'BACKFILL': 50,
+    # Seconds the set of celebrity ids is cached for.
+    'CELEBRITY_CACHE_TIMEOUT': 300,
+}
+
+CELEBRITY_CACHE_KEY = 'posts:timeline:celebrities'
+# The last computed set, kept without expiry to spot authors who dropped out.
+CELEBRITY_KNOWN_KEY = 'posts:timeline:celebrities:known'
+
+User = get_user_model()
+
+
+def get_setting(name):
+    return getattr(settings, 'POSTS_TIMELINE', {}).get(name, DEFAULTS[name])
+
+
+class BaseTimelineBackend:
+    """
+    Entries are ``(created_at, post_id, author_id)`` tuples and are always
+    returned newest first.
+    """
+
+    def push(self, owner_ids, entries):
+        raise NotImplementedError
+
+    def range(self, owner_id, limit, before=None):
+        """Return up to ``limit`` entries older than the ``(created_at, post_id)`` cursor ``before``."""
+        raise NotImplementedError
+
+    def remove_author(self, owner_id, author_id):
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        raise NotImplementedError
+
+    def clear(self, owner_id):
+        raise NotImplementedError
+
+    def trim(self, owner_id, max_length):
+        raise NotImplementedError
+
+    def trim_all(self, max_length):
+        """Trim every timeline longer than ``max_length``; return how many were trimmed."""
+        raise NotImplementedError
+
+
+class DatabaseTimelineBackend(BaseTimelineBackend):
+    batch_size = 1000
+
+    def push(self, owner_ids, entries):
+        rows = [
+            TimelineEntry(owner_id=owner_id, post_id=post_id, created_at=created_at)
+            for owner_id in owner_ids
+            for created_at, post_id, _ in entries
+        ]
+        TimelineEntry.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+
+    def range(self, owner_id, limit, before=None):
+        entries = TimelineEntry.objects.filter(owner_id=owner_id)
+        if before is not None:
+            created_at, post_id = before
+            entries = entries.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lt=post_id)
+            )
+        return list(
+            entries.order_by('-created_at', '-post_id')
+            .values_list('created_at', 'post_id', 'post__author_id')[:limit]
+        )
+
+    def remove_author(self, owner_id, author_id):
+        TimelineEntry.objects.filter(owner_id=owner_id, post__author_id=author_id).delete()
+
+    def remove_posts(self, post_ids):
+        # Rows go away with the post through the CASCADE foreign key.
+        pass
+
+    def clear(self, owner_id):
+        TimelineEntry.objects.filter(owner_id=owner_id).delete()
+
+    def trim(self, owner_id, max_length):
+        stale = (
+            TimelineEntry.objects.filter(owner_id=owner_id)
+            .order_by('-created_at', '-post_id')
+            .values_list('pk', flat=True)[max_length:]
+        )
+        TimelineEntry.objects.filter(pk__in=list(stale)).delete()
+
+    def trim_all(self, max_length):
+        overfull = (
+            TimelineEntry.objects.values('owner_id').annotate(length=Count('pk'))
+            .filter(length__gt=max_length).values_list('owner_id', flat=True)
+        )
+        owner_ids = list(overfull)
+        for owner_id in owner_ids:
+            self.trim(owner_id, max_length)
+        return len(owner_ids)
+
+
+class LocalMemoryTimelineBackend(BaseTimelineBackend):
+    """
+    In-process timelines for development and tests. Each user's entries are
+    kept in ascending order and capped at ``MAX_LENGTH``.
+    """
+
+    def __init__(self):
+        self._timelines = {}
+        self._lock = threading.Lock()
+
+    def push(self, owner_ids, entries):
+        max_length = get_setting('MAX_LENGTH')
+        with self._lock:
+            for owner_id in owner_ids:
+                timeline = self._timelines.setdefault(owner_id, [])
+                for entry in entries:
+                    index = bisect.bisect_left(timeline, entry)
+                    if index == len(timeline) or timeline[index] != entry:
+                        timeline.insert(index, entry)
+                if len(timeline) > max_length:
+                    del timeline[:len(timeline) - max_length]
+
+    def range(self, owner_id, limit, before=None):
+        with self._lock:
+            timeline = self._timelines.get(owner_id, [])
+            end = len(timeline)
+            if before is not None:
+                end = bisect.bisect_left(timeline, tuple(before))
+            return list(islice(reversed(timeline[max(end - limit, 0):end]), limit))
+
+    def remove_author(self, owner_id, author_id):
+        with self._lock:
+            timeline = self._timelines.get(owner_id)
+            if timeline:
+                timeline[:] = [entry for entry in timeline if entry[2] != author_id]
+
+    def remove_posts(self, post_ids):
+        post_ids = set(post_ids)
+        with self._lock:
+            for timeline in self._timelines.values():
+                timeline[:] = [entry for entry in timeline if entry[1] not in post_ids]
+
+    def clear(self, owner_id):
+        with self._lock:
+            self._timelines.pop(owner_id, None)
+
+    def trim(self, owner_id, max_length):
+        with self._lock:
+            timeline = self._timelines.get(owner_id)
+            if timeline and len(timeline) > max_length:
+                del timeline[:len(timeline) - max_length]
+
+    def trim_all(self, max_length):
+        with self._lock:
+            overfull = [owner_id for owner_id, timeline in self._timelines.items() if len(timeline) > max_length]
+        for owner_id in overfull:
+            self.trim(owner_id, max_length)
+        return len(overfull)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(get_setting('BACKEND'))()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'POSTS_TIMELINE':
+        _backend = None
+
+
+def celebrity_ids():
+    """
+    Ids of authors whose posts are pulled at read time instead of fanned out.
+
+    Fan-out and reads both go through this one cached set, so a post is
+    either pushed or pulled, never neither. An author who drops out of the
+    set stays in it until ``_demote()`` has pushed their recent posts to
+    their followers, off the request that noticed.
+    """
+    ids = cache.get(CELEBRITY_CACHE_KEY)
+    if ids is None:
+        current = set(
+            User.objects.annotate(follower_total=Count('followers'))
+            .filter(follower_total__gte=get_setting('CELEBRITY_THRESHOLD'))
+            .values_list('pk', flat=True)
+        )
+        demoted = cache.get(CELEBRITY_KNOWN_KEY, set()) - current
+        ids = current | demoted
+        cache.set(CELEBRITY_CACHE_KEY, ids, get_setting('CELEBRITY_CACHE_TIMEOUT'))
+        cache.set(CELEBRITY_KNOWN_KEY, ids, None)
+        if demoted:
+            transaction.on_commit(lambda: _schedule_demotion(demoted))
+    return ids
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='timeline')
+
+
+def _schedule_demotion(author_ids):
+    if get_setting('ASYNC'):
+        _executor.submit(_demote_in_worker, author_ids).add_done_callback(_log_failure)
+    else:
+        _demote(author_ids)
+
+
+def _log_failure(future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Backfilling demoted celebrities failed", exc_info=exc)
+
+
+def _demote_in_worker(author_ids):
+    close_old_connections()
+    try:
+        _demote(author_ids)
+    finally:
+        close_old_connections()
+
+
+def _demote(author_ids):
+    """Push the recent posts of ``author_ids`` to their followers, then stop pulling them."""
+    for author_id in author_ids:
+        push_recent(author_id, follower_ids(author_id))
+    cache.set(CELEBRITY_KNOWN_KEY, cache.get(CELEBRITY_KNOWN_KEY, set()) - set(author_ids), None)
+    cache.delete(CELEBRITY_CACHE_KEY)
+
+
+def entry_for(post):
+    return (post.created_at, post.pk, post.author_id)
+
+
+def push_recent(author_id, owner_ids):
+    """Copy an author's ``BACKFILL`` most recent posts into the timelines of ``owner_ids``."""
+    if not owner_ids:
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by('-created_at', '-id')
+    entries = list(posts.values_list('created_at', 'id', 'author_id')[:get_setting('BACKFILL')])
+    if entries:
+        get_backend().push(owner_ids, entries)
+
+
+def follower_ids(author_id):
+    """
+    Current followers, read from the follow table. The write path cannot use
+    ``follow_graph``: a follower missing from a stale cached set would never
+    receive the post.
+    """
+    return list(User.objects.filter(following=author_id).values_list('pk', flat=True))
+
+
+def fan_out_post(post):
+    """Push a new post into the timelines of its author's followers."""
+    if post.author_id in celebrity_ids():
+        return
+    owner_ids = follower_ids(post.author_id)
+    if owner_ids:
+        get_backend().push(owner_ids, [entry_for(post)])
+
+
+def backfill(owner_id, author_id):
+    """Copy an author's recent posts into a timeline after a new follow."""
+    if author_id in celebrity_ids():
+        return
+    push_recent(author_id, [owner_id])
+    get_backend().trim(owner_id, get_setting('MAX_LENGTH'))
+
+
+def trim_all():
+    return get_backend().trim_all(get_setting('MAX_LENGTH'))
+
+
+def read_timeline(user, limit, before=None):
+    """
+    Return up to ``limit`` posts for ``user``'s home feed, newest first.
+
+    Fanned-out entries come from the backend; posts by followed celebrities
+    are pulled with one query and merged in by ``(created_at, id)``.
+    """
+    # Resolve celebrities first: refreshing the set may push posts into this timeline.
+    celebrities = follow_graph.following(user.pk) & celebrity_ids()
+    entries = get_backend().range(user.pk, limit, before)
+
+    if celebrities:
+        pulled = Post.objects.filter(author__in=celebrities).order_by('-created_at', '-id')
+        if before is not None:
+            created_at, post_id = before
+            pulled = pulled.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+        pulled = list(pulled.values_list('created_at', 'id', 'author_id')[:limit])
+        entries = list(islice(heapq.merge(entries, pulled, reverse=True), limit))
+
+    # A post can be both fanned out and pulled if its author crossed the threshold.
+    post_ids = list(dict.fromkeys(post_id for _, post_id, _ in entries))
+    posts = Post.objects.select_related('author').in_bulk(post_ids)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
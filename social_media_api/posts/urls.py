@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import FeedView
+from rest_framework.routers import DefaultRouter
+from .views import PostViewSet, CommentViewSet, FeedView, LikePostView, UnlikePostView
 
-urlpatterns = [
+router = DefaultRouter()
+router.register('posts', PostViewSet)
+router.register('comments', CommentViewSet)
+
+urlpatterns = router.urls + [
     path('feed/', FeedView.as_view(), name='feed'),
-     path('posts/<int:pk>/like/', LikePostView.as_view(), name='like-post'),
+    path('posts/<int:pk>/like/', LikePostView.as_view(), name='like-post'),
     path('posts/<int:pk>/unlike/', UnlikePostView.as_view(), name='unlike-post'),
 ]
 
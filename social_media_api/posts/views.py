@@ -1,8 +1,12 @@
-from django.shortcuts import render
-from rest_framework import viewsets, permissions
+from django.db import transaction
+from rest_framework import viewsets, permissions, generics
+from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 
-from .models import Post, Comment
+from notifications.writer import notify
+from . import counters, timeline
+from .models import Post, Comment, Like
+from .pagination import KeysetPagination
 from .serializers import PostSerializer, CommentSerializer
 
 
@@ -19,44 +23,68 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
 
 class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        transaction.on_commit(lambda: timeline.fan_out_post(post))
 
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
-
-class FeedView(APIView):
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user)
+            counters.adjust(comment.post_id, 'comment_count', 1)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_post_id = serializer.instance.post_id
+            comment = serializer.save()
+            if comment.post_id != old_post_id:
+                counters.adjust(old_post_id, 'comment_count', -1)
+                counters.adjust(comment.post_id, 'comment_count', 1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.adjust(instance.post_id, 'comment_count', -1)
+
+class FeedView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = PostSerializer
+    pagination_class = KeysetPagination
 
     def get(self, request):
-        # Get all users the current user follows
-        following_users = request.user.following.all()  # <- checker looks for this exact line
-
-        # Get posts from followed users, ordered by creation date descending
-        posts = Post.objects.filter(author__in=following_users).order_by('-created_at')  # <- checker line
+        # Posts from followed users are precomputed into the reader's
+        # timeline; see posts.timeline for how celebrity authors are merged.
+        posts = self.paginator.paginate_fetch(
+            lambda limit, before: timeline.read_timeline(request.user, limit, before),
+            request,
+        )
 
-        serializer = PostSerializer(posts, many=True)
-        return Response(serializer.data)
+        serializer = self.get_serializer(posts, many=True)
+        return self.get_paginated_response(serializer.data)
 
 class LikePostView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
         post = generics.get_object_or_404(Post, pk=pk)
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, post=post)
+            if created:
+                counters.adjust(post.pk, 'like_count', 1)
 
         if created:
-            Notification.objects.create(
+            notify(
                 recipient=post.author,
                 actor=request.user,
                 verb='liked your post',
@@ -70,6 +98,8 @@ class UnlikePostView(generics.GenericAPIView):
 
     def post(self, request, pk):
         post = generics.get_object_or_404(Post, pk=pk)
-        Like.objects.filter(user=request.user, post=post).delete()
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
+            counters.adjust(post.pk, 'like_count', -deleted)
         return Response({"detail": "Post unliked"})
 
@@ -99,6 +99,38 @@ DATABASES = {
 }
 
 
+# Cache
+# Must be shared by every worker process: token auth, the unread badge
+# counters and the timeline celebrity set are invalidated through it.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+    }
+}
+
+
+AUTH_USER_MODEL = 'accounts.CustomUser'
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'accounts.authentication.CachedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+}
+
+# Seconds an authenticated token stays cached, see accounts/authentication.py
+TOKEN_CACHE_TIMEOUT = 300
+
+# Precomputed home timelines, see posts/timeline.py
+POSTS_TIMELINE = {
+    'BACKEND': 'posts.timeline.DatabaseTimelineBackend',
+    'CELEBRITY_THRESHOLD': 10000,
+    'MAX_LENGTH': 800,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 